@@ -1,22 +1,83 @@
 import argparse
+import atexit
 import mmap
 import os
 import sys
 
+from . import cache
 from .error import LoxError
-from .lex import Lexer
-from .parse import Parser
+from .lex import Lexer, RegexLexer
+from .parse import Parser, StreamingParser
+from .profile import Profiler
+from .stats import Stats, measure
 from .ast.printer import ASTPrinter
+from .closure import ClosureInterpreter
 from .interpret import Interpreter
+from .optimize import Optimizer
 from .resolve import Resolver
+from .vm import VM
+
+ENGINES = dict(tree=Interpreter, vm=VM, closure=ClosureInterpreter)
+LEXERS = dict(byte=Lexer, regex=RegexLexer)
+
+def parse(buffer):
+    with measure(stats, 'lex'):
+        tokens = LEXERS[args.lexer](buffer).scan()
+    with measure(stats, 'parse'):
+        statements = Parser(tokens).parse()
+    with measure(stats, 'resolve'):
+        Resolver().resolve(statements)
+    with measure(stats, 'optimize'):
+        statements = Optimizer().optimize(statements)
+
+    return len(tokens), statements
+
+def record(token_count, statements):
+    if stats is not None:
+        stats.tokens += token_count
+        stats.count_nodes(statements)
+
+def prepare(buffer):
+    token_count, statements = parse(buffer)
+    record(token_count, statements)
+    return statements
 
 def run(interp, buffer):
-    lexer = Lexer(buffer)
-    parser = Parser(list(lexer.tokens()))
-    statements = parser.parse()
-    resolver = Resolver(interp)
-    resolver.resolve(statements)
-    interp.interpret(statements)
+    interp.interpret(prepare(buffer), stats)
+
+def prepare_cached(script, buffer):
+    # The token count is cached too, for --stats.
+    with measure(stats, 'load'):
+        entry = cache.load(script, buffer)
+    if entry is None:
+        entry = parse(buffer)
+        with measure(stats, 'store'):
+            cache.store(script, buffer, entry)
+
+    record(*entry)
+    return entry[1]
+
+def run_streaming(interp, buffer):
+    tokens = LEXERS[args.lexer](buffer).stream()
+    parser = StreamingParser(tokens).declarations()
+    resolver = Resolver()
+    optimizer = Optimizer()
+    while True:
+        # The lexer runs as the parser asks for tokens, so parse includes it.
+        with measure(stats, 'parse'):
+            statement = next(parser, None)
+        if statement is None:
+            break
+        with measure(stats, 'resolve'):
+            resolver.resolve([statement])
+        with measure(stats, 'optimize'):
+            statements = optimizer.optimize([statement])
+        if stats is not None:
+            stats.count_nodes(statements)
+        interp.interpret(statements, stats)
+
+    if stats is not None:
+        stats.tokens += tokens.discarded + len(tokens)
 
 def run_REPL(interp):
     try:
@@ -29,21 +90,56 @@ def run_REPL(interp):
         print()
 
 def run_script(interp, script):
-    with (
-        open(script) as inf,
-        mmap.mmap(inf.fileno(), 0, access=mmap.ACCESS_READ) as mm
-    ):
-        try:
-            run(interp, mm)
-        except LoxError as e:
-            print(e, file=sys.stderr)
-            sys.exit(1)
+    try:
+        with (
+            open(script) as inf,
+            mmap.mmap(inf.fileno(), 0, access=mmap.ACCESS_READ) as mm
+        ):
+            if args.stream:
+                run_streaming(interp, mm)
+                return
+            elif args.no_cache:
+                statements = prepare(mm)
+            else:
+                statements = prepare_cached(script, mm)
+
+        # Tokens hold their own lexemes, so the script is unmapped first.
+        interp.interpret(statements, stats)
+    except LoxError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
 
 parser = argparse.ArgumentParser()
 parser.add_argument('script', nargs='?')
+parser.add_argument('--engine', choices=ENGINES, default='tree')
+parser.add_argument('--lexer', choices=LEXERS, default='byte')
+parser.add_argument('--stream', action='store_true'
+    , help='run each top-level declaration as soon as it is parsed')
+parser.add_argument('--no-cache', action='store_true'
+    , help="don't read or write the __loxcache__ of parsed scripts")
+parser.add_argument('--profile', metavar='FILE'
+    , help='sample the Lox call stack, write it to FILE as collapsed stacks'
+    ' and print the hottest functions')
+parser.add_argument('--stats', metavar='FILE'
+    , help="write phase times, AST node counts and runtime event counts to"
+    " FILE ('-' for stderr)")
+parser.add_argument('--stats-format', choices=('text', 'json'), default='text')
 args = parser.parse_args()
+if args.script is None and args.profile is not None:
+    parser.error('--profile needs a script')
 
-i = Interpreter()
+i = ENGINES[args.engine]()
+stats = None if args.stats is None else Stats()
+
+def write_stats():
+    if '-' == args.stats:
+        stats.write(sys.stderr, args.stats_format)
+    else:
+        with open(args.stats, 'w') as out:
+            stats.write(out, args.stats_format)
+
+if stats is not None:
+    atexit.register(write_stats)
 
 if args.script is None:
     run_REPL(i)
@@ -52,4 +148,15 @@ else:
         raise SystemExit(f'File does not exist: {args.script}')
     if 0 == os.path.getsize(args.script):
         sys.exit(0)
-    run_script(i, args.script)
+    if args.profile is None:
+        run_script(i, args.script)
+    else:
+        profiler = Profiler()
+        profiler.start()
+        try:
+            run_script(i, args.script)
+        finally:
+            profiler.stop()
+            with open(args.profile, 'w') as out:
+                profiler.write_collapsed(out)
+            profiler.write_summary(sys.stderr)
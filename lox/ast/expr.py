@@ -1,22 +1,34 @@
 # Automatically generated
 from abc import ABC, abstractmethod
 class Expr(ABC):
+    __slots__ = ()
     @abstractmethod
     def accept(self, visitor): pass
 class Assign(Expr):
+    __slots__ = ('name', 'value', 'depth', 'slot')
+    __match_args__ = ('name', 'value')
     def __init__(self, name, value):
         self.name = name
         self.value = value
+        self.depth = None
+        self.slot = None
     def accept(self, visitor):
         return visitor.visit_assign_expr(self)
 class Binary(Expr):
+    __slots__ = ('left', 'operator', 'right', 'left_type', 'right_type', 'fast')
+    __match_args__ = ('left', 'operator', 'right')
     def __init__(self, left, operator, right):
         self.left = left
         self.operator = operator
         self.right = right
+        self.left_type = None
+        self.right_type = None
+        self.fast = None
     def accept(self, visitor):
         return visitor.visit_binary_expr(self)
 class Call(Expr):
+    __slots__ = ('callee', 'paren', 'arguments')
+    __match_args__ = ('callee', 'paren', 'arguments')
     def __init__(self, callee, paren, arguments):
         self.callee = callee
         self.paren = paren
@@ -24,22 +36,33 @@ class Call(Expr):
     def accept(self, visitor):
         return visitor.visit_call_expr(self)
 class Get(Expr):
+    __slots__ = ('object', 'name', 'shape', 'slot', 'method')
+    __match_args__ = ('object', 'name')
     def __init__(self, object, name):
         self.object = object
         self.name = name
+        self.shape = None
+        self.slot = None
+        self.method = None
     def accept(self, visitor):
         return visitor.visit_get_expr(self)
 class Grouping(Expr):
+    __slots__ = ('expression',)
+    __match_args__ = ('expression',)
     def __init__(self, expression):
         self.expression = expression
     def accept(self, visitor):
         return visitor.visit_grouping_expr(self)
 class Literal(Expr):
+    __slots__ = ('value',)
+    __match_args__ = ('value',)
     def __init__(self, value):
         self.value = value
     def accept(self, visitor):
         return visitor.visit_literal_expr(self)
 class Logical(Expr):
+    __slots__ = ('left', 'operator', 'right')
+    __match_args__ = ('left', 'operator', 'right')
     def __init__(self, left, operator, right):
         self.left = left
         self.operator = operator
@@ -47,32 +70,51 @@ class Logical(Expr):
     def accept(self, visitor):
         return visitor.visit_logical_expr(self)
 class Set(Expr):
+    __slots__ = ('object', 'name', 'value', 'shape', 'slot', 'transition')
+    __match_args__ = ('object', 'name', 'value')
     def __init__(self, object, name, value):
         self.object = object
         self.name = name
         self.value = value
+        self.shape = None
+        self.slot = None
+        self.transition = None
     def accept(self, visitor):
         return visitor.visit_set_expr(self)
 class Super(Expr):
+    __slots__ = ('keyword', 'method', 'depth', 'slot')
+    __match_args__ = ('keyword', 'method')
     def __init__(self, keyword, method):
         self.keyword = keyword
         self.method = method
+        self.depth = None
+        self.slot = None
     def accept(self, visitor):
         return visitor.visit_super_expr(self)
 class This(Expr):
+    __slots__ = ('keyword', 'depth', 'slot')
+    __match_args__ = ('keyword',)
     def __init__(self, keyword):
         self.keyword = keyword
+        self.depth = None
+        self.slot = None
     def accept(self, visitor):
         return visitor.visit_this_expr(self)
 class Unary(Expr):
+    __slots__ = ('operator', 'right')
+    __match_args__ = ('operator', 'right')
     def __init__(self, operator, right):
         self.operator = operator
         self.right = right
     def accept(self, visitor):
         return visitor.visit_unary_expr(self)
 class Variable(Expr):
+    __slots__ = ('name', 'depth', 'slot')
+    __match_args__ = ('name',)
     def __init__(self, name):
         self.name = name
+        self.depth = None
+        self.slot = None
     def accept(self, visitor):
         return visitor.visit_variable_expr(self)
 class Visitor(ABC):
@@ -0,0 +1,66 @@
+# Automatically generated
+from abc import ABC, abstractmethod
+class Fused(ABC):
+    __slots__ = ()
+    @abstractmethod
+    def accept(self, visitor): pass
+class CallGlobal(Fused):
+    __slots__ = ('generic', 'slot', 'arguments')
+    __match_args__ = ('generic', 'slot', 'arguments')
+    def __init__(self, generic, slot, arguments):
+        self.generic = generic
+        self.slot = slot
+        self.arguments = arguments
+    def accept(self, visitor):
+        return visitor.visit_call_global_fused(self)
+class CompareLocal(Fused):
+    __slots__ = ('generic', 'depth', 'slot', 'compare', 'right')
+    __match_args__ = ('generic', 'depth', 'slot', 'compare', 'right')
+    def __init__(self, generic, depth, slot, compare, right):
+        self.generic = generic
+        self.depth = depth
+        self.slot = slot
+        self.compare = compare
+        self.right = right
+    def accept(self, visitor):
+        return visitor.visit_compare_local_fused(self)
+class CompareLocalConst(Fused):
+    __slots__ = ('generic', 'depth', 'slot', 'compare', 'constant')
+    __match_args__ = ('generic', 'depth', 'slot', 'compare', 'constant')
+    def __init__(self, generic, depth, slot, compare, constant):
+        self.generic = generic
+        self.depth = depth
+        self.slot = slot
+        self.compare = compare
+        self.constant = constant
+    def accept(self, visitor):
+        return visitor.visit_compare_local_const_fused(self)
+class GetPath(Fused):
+    __slots__ = ('object', 'gets')
+    __match_args__ = ('object', 'gets')
+    def __init__(self, object, gets):
+        self.object = object
+        self.gets = gets
+    def accept(self, visitor):
+        return visitor.visit_get_path_fused(self)
+class IncrementLocal(Fused):
+    __slots__ = ('generic', 'depth', 'slot', 'delta')
+    __match_args__ = ('generic', 'depth', 'slot', 'delta')
+    def __init__(self, generic, depth, slot, delta):
+        self.generic = generic
+        self.depth = depth
+        self.slot = slot
+        self.delta = delta
+    def accept(self, visitor):
+        return visitor.visit_increment_local_fused(self)
+class Visitor(ABC):
+    @abstractmethod
+    def visit_call_global_fused(self, f): pass
+    @abstractmethod
+    def visit_compare_local_fused(self, f): pass
+    @abstractmethod
+    def visit_compare_local_const_fused(self, f): pass
+    @abstractmethod
+    def visit_get_path_fused(self, f): pass
+    @abstractmethod
+    def visit_increment_local_fused(self, f): pass
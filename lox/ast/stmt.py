@@ -1,14 +1,19 @@
 # Automatically generated
 from abc import ABC, abstractmethod
 class Stmt(ABC):
+    __slots__ = ()
     @abstractmethod
     def accept(self, visitor): pass
 class Block(Stmt):
+    __slots__ = ('statements',)
+    __match_args__ = ('statements',)
     def __init__(self, statements):
         self.statements = statements
     def accept(self, visitor):
         return visitor.visit_block_stmt(self)
 class Class(Stmt):
+    __slots__ = ('name', 'superclass', 'methods')
+    __match_args__ = ('name', 'superclass', 'methods')
     def __init__(self, name, superclass, methods):
         self.name = name
         self.superclass = superclass
@@ -16,11 +21,15 @@ class Class(Stmt):
     def accept(self, visitor):
         return visitor.visit_class_stmt(self)
 class Expression(Stmt):
+    __slots__ = ('expression',)
+    __match_args__ = ('expression',)
     def __init__(self, expression):
         self.expression = expression
     def accept(self, visitor):
         return visitor.visit_expression_stmt(self)
 class Function(Stmt):
+    __slots__ = ('name', 'parameters', 'body')
+    __match_args__ = ('name', 'parameters', 'body')
     def __init__(self, name, parameters, body):
         self.name = name
         self.parameters = parameters
@@ -28,6 +37,8 @@ class Function(Stmt):
     def accept(self, visitor):
         return visitor.visit_function_stmt(self)
 class If(Stmt):
+    __slots__ = ('condition', 'then_branch', 'else_branch')
+    __match_args__ = ('condition', 'then_branch', 'else_branch')
     def __init__(self, condition, then_branch, else_branch):
         self.condition = condition
         self.then_branch = then_branch
@@ -35,23 +46,31 @@ class If(Stmt):
     def accept(self, visitor):
         return visitor.visit_if_stmt(self)
 class Print(Stmt):
+    __slots__ = ('expression',)
+    __match_args__ = ('expression',)
     def __init__(self, expression):
         self.expression = expression
     def accept(self, visitor):
         return visitor.visit_print_stmt(self)
 class Return(Stmt):
+    __slots__ = ('keyword', 'value')
+    __match_args__ = ('keyword', 'value')
     def __init__(self, keyword, value):
         self.keyword = keyword
         self.value = value
     def accept(self, visitor):
         return visitor.visit_return_stmt(self)
 class Var(Stmt):
+    __slots__ = ('name', 'initializer')
+    __match_args__ = ('name', 'initializer')
     def __init__(self, name, initializer):
         self.name = name
         self.initializer = initializer
     def accept(self, visitor):
         return visitor.visit_var_stmt(self)
 class While(Stmt):
+    __slots__ = ('condition', 'body')
+    __match_args__ = ('condition', 'body')
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
@@ -0,0 +1,172 @@
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import sys
+import time
+
+from pathlib import Path
+
+from .closure import ClosureInterpreter
+from .interpret import Interpreter
+from .lex import Lexer, RegexLexer
+from .optimize import Optimizer
+from .parse import Parser
+from .resolve import Resolver
+from .vm import VM
+
+ENGINES = dict(tree=Interpreter, vm=VM, closure=ClosureInterpreter)
+LEXERS = dict(byte=Lexer, regex=RegexLexer)
+PHASES = ('lex', 'parse', 'resolve', 'optimize', 'interpret')
+
+# Repeated to make a large script for the lexer and parser. It is never run.
+LARGE_TEMPLATE = '''
+fun f{0}(a, b) {{
+    var c = a + b * {0};
+    if (c > {0} and !(a == b)) {{
+        c = c - 1;
+    }}
+    return c;
+}}
+class C{0} {{
+    init(x) {{ this.x = x; }}
+    get() {{ return this.x + {0}; }}
+}}
+print f{0}(C{0}({0}).get(), "{0}");
+'''
+
+def large_script(count):
+    return ''.join(LARGE_TEMPLATE.format(i) for i in range(count)).encode()
+
+def run_once(source, lexer, engine, interpret=True):
+    times = {}
+
+    def timed(phase, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        times[phase] = time.perf_counter() - start
+        return result
+
+    tokens = timed('lex', lexer(source).scan)
+    statements = timed('parse', Parser(tokens).parse)
+    timed('resolve', Resolver().resolve, statements)
+    statements = timed('optimize', Optimizer().optimize, statements)
+    if interpret:
+        with contextlib.redirect_stdout(io.StringIO()):
+            timed('interpret', engine().interpret, statements)
+
+    times['total'] = sum(times.values())
+    return times
+
+def summarize(samples):
+    return {
+        phase: dict(
+            median=statistics.median(values)
+            , stdev=statistics.stdev(values) if len(values) > 1 else 0.0
+            , samples=values
+        )
+        for phase in (*PHASES, 'total')
+        if (values := [sample[phase] for sample in samples if phase in sample])
+    }
+
+def mismatches(results, baseline):
+    # Settings that change the timings, so that a baseline taken with other
+    # settings can't be compared with these results.
+    for key in ('engine', 'lexer', 'python'):
+        if baseline.get(key) != results[key]:
+            yield key, baseline.get(key), results[key]
+
+def regressions(results, baseline, threshold, floor):
+    # Medians that grew by more than the threshold, ignoring phases too
+    # short to time reliably.
+    for name, phases in results['benchmarks'].items():
+        for phase, stats in phases.items():
+            try:
+                before = baseline['benchmarks'][name][phase]['median']
+            except KeyError:
+                continue
+
+            after = stats['median']
+            if max(before, after) >= floor and after > before * (1 + threshold):
+                yield name, phase, before, after
+
+def report(results, out):
+    print(f'{"benchmark":<16}{"phase":<11}{"median":>10}{"stdev":>10}', file=out)
+    for name, phases in results['benchmarks'].items():
+        for phase, stats in phases.items():
+            print(f'{name:<16}{phase:<11}{stats["median"] * 1000:>8.1f}ms'
+                f'{stats["stdev"] * 1000:>8.1f}ms', file=out)
+
+parser = argparse.ArgumentParser(prog='python -m lox.bench')
+parser.add_argument('names', nargs='*'
+    , help='benchmarks to run (default: all, plus large)')
+parser.add_argument('-d', '--dir', type=Path
+    , default=Path(__file__).parent.parent / 'bench'
+    , help='directory of benchmark scripts')
+parser.add_argument('-n', '--runs', type=int, default=5)
+parser.add_argument('--engine', choices=ENGINES, default='tree')
+parser.add_argument('--lexer', choices=LEXERS, default='byte')
+parser.add_argument('--large', type=int, default=5000
+    , help='template repetitions in the generated large script')
+parser.add_argument('--json', action='store_true'
+    , help='print the results as JSON instead of a table')
+parser.add_argument('--save', type=Path, help='write the results to a file')
+parser.add_argument('--baseline', type=Path
+    , help='compare against results saved with --save by the same engine'
+        ' and lexer on the same Python')
+parser.add_argument('--threshold', type=float, default=0.10
+    , help='relative slowdown of a median that counts as a regression')
+parser.add_argument('--floor', type=float, default=0.005
+    , help='ignore phases with medians under this many seconds')
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+
+    scripts = {path.stem: path for path in sorted(args.dir.glob('*.lox'))}
+    names = args.names or [*scripts, 'large']
+    for name in names:
+        if name != 'large' and name not in scripts:
+            parser.error(f'no benchmark named {name!r} in {args.dir}')
+
+    results = dict(
+        python=sys.version, engine=args.engine, lexer=args.lexer
+        , runs=args.runs, benchmarks={}
+    )
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        for key, before, after in mismatches(results, baseline):
+            parser.error(f'{args.baseline} was run with {key} {before!r}'
+                f', not {after!r}')
+
+    for name in names:
+        if 'large' == name:
+            source = large_script(args.large)
+        else:
+            source = scripts[name].read_bytes()
+
+        results['benchmarks'][name] = summarize([
+            run_once(
+                source, LEXERS[args.lexer], ENGINES[args.engine]
+                , interpret='large' != name
+            )
+            for _ in range(args.runs)
+        ])
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        report(results, sys.stdout)
+
+    if args.save is not None:
+        args.save.write_text(json.dumps(results, indent=2) + '\n')
+
+    if args.baseline is not None:
+        slower = list(regressions(results, baseline, args.threshold, args.floor))
+        for name, phase, before, after in slower:
+            print(f'REGRESSION {name} {phase}: {before * 1000:.1f}ms'
+                f' -> {after * 1000:.1f}ms (+{after / before - 1:.0%})'
+                , file=sys.stderr)
+        if slower:
+            sys.exit(1)
@@ -0,0 +1,110 @@
+import copyreg
+import functools
+import hashlib
+import io
+import os
+import pickle
+import sys
+
+from pathlib import Path
+
+from .ast import expr, stmt
+from .lex import Token, TokenType
+
+MAGIC = b'LOXC'
+DIGEST_SIZE = 16
+
+# Nodes are saved as their constructor arguments plus any annotations set by
+# the Resolver, instead of as a generic dict of every slot. Unset annotations,
+# such as the inline caches filled in at run time, are left out.
+def reduce_node(node):
+    cls = type(node)
+    fields = cls.__match_args__
+    args = tuple(getattr(node, field) for field in fields)
+    annotations = {
+        name: value for name in cls.__slots__[len(fields):]
+        if (value := getattr(node, name)) is not None
+    }
+
+    return cls, args, (None, annotations) if annotations else None
+
+# Tokens are saved as plain values and their lexemes interned again on load.
+def reduce_token(token):
+    return load_token, (
+        int(token.type), token.lexeme, token.line, token.literal
+    )
+
+def load_token(type, lexeme, line, literal):
+    return Token(TokenType(type), sys.intern(lexeme), line, literal)
+
+DISPATCH_TABLE = copyreg.dispatch_table.copy()
+DISPATCH_TABLE[Token] = reduce_token
+for node_type in (*expr.Expr.__subclasses__(), *stmt.Stmt.__subclasses__()):
+    DISPATCH_TABLE[node_type] = reduce_node
+
+# Lox scripts can write into __loxcache__, so loading must not reach any
+# callable but the ones the pickler above writes.
+LOADABLE = {
+    (node_type.__module__, node_type.__qualname__): node_type
+    for node_type in (*expr.Expr.__subclasses__(), *stmt.Stmt.__subclasses__())
+}
+LOADABLE[load_token.__module__, load_token.__qualname__] = load_token
+
+class Unpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        try:
+            return LOADABLE[module, name]
+        except KeyError:
+            raise pickle.UnpicklingError(
+                f"can't load {module}.{name} from a cache") from None
+
+# Anything that changes the shape of the cached trees changes the package
+# sources, so those (plus the Python version, for pickle) are the version.
+@functools.cache
+def version():
+    digest = hashlib.blake2b(sys.version.encode(), digest_size=DIGEST_SIZE)
+    for path in sorted(Path(__file__).parent.rglob('*.py')):
+        digest.update(path.read_bytes())
+
+    return digest.digest()
+
+def source_digest(source):
+    return hashlib.blake2b(source, digest_size=DIGEST_SIZE).digest()
+
+def cache_path(script):
+    script = Path(script)
+    return script.parent / '__loxcache__' / f'{script.name}c'
+
+def header(source):
+    return MAGIC + version() + source_digest(source)
+
+def load(script, source):
+    try:
+        with cache_path(script).open('rb') as inf:
+            if inf.read(len(MAGIC) + 2 * DIGEST_SIZE) != header(source):
+                return None
+
+            return Unpickler(inf).load()
+    except Exception:
+        # A damaged cache is only a missed optimization.
+        return None
+
+def store(script, source, entry):
+    path = cache_path(script)
+    partial = path.with_name(f'{path.name}.{os.getpid()}')
+    try:
+        payload = io.BytesIO()
+        pickler = pickle.Pickler(payload, pickle.HIGHEST_PROTOCOL)
+        pickler.dispatch_table = DISPATCH_TABLE
+        pickler.dump(entry)
+        path.parent.mkdir(exist_ok=True)
+        try:
+            with partial.open('wb') as out:
+                out.write(header(source))
+                out.write(payload.getbuffer())
+            os.replace(partial, path)
+        finally:
+            # Only left behind if writing or replacing failed.
+            partial.unlink(missing_ok=True)
+    except (OSError, RecursionError, pickle.PicklingError):
+        pass
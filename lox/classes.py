@@ -1,5 +1,5 @@
 from .callable import Callable
-from .instance import Instance
+from .instance import Instance, Shape
 
 class Class(Callable):
     def __init__(self, name, superclass, methods):
@@ -7,27 +7,28 @@ class Class(Callable):
         self.superclass = superclass
         self.methods = methods
 
+        # Inherited methods are flattened in once so that lookups never walk
+        # the superclass chain.
+        self.vtable = methods
+        if superclass is not None:
+            self.vtable = {**superclass.vtable, **methods}
+
+        self.initializer = self.vtable.get('init')
+        self.arity_ = 0 if self.initializer is None else self.initializer.arity()
+        self.shape = Shape(self)
+
     def __str__(self):
         return self.name
 
     def arity(self):
-        init = self.find_method('init')
-        if init is None:
-            return 0
-
-        return init.arity()
+        return self.arity_
 
     def call(self, interpreter, arguments):
         instance = Instance(self)
-        init = self.find_method('init')
-        if init is not None:
-            init.bind(instance).call(interpreter, arguments)
+        if self.initializer is not None:
+            self.initializer.call_method(interpreter, instance, arguments)
 
         return instance
 
     def find_method(self, name):
-        if name in self.methods:
-            return self.methods[name]
-
-        if self.superclass is not None:
-            return self.superclass.find_method(name)
+        return self.vtable.get(name)
@@ -0,0 +1,493 @@
+import operator
+
+from .ast import expr, stmt
+from .callable import Callable
+from .classes import Class
+from .environment import Environment, Globals
+from .error import error
+from .instance import Instance
+from .lex import TokenType
+from .natives import (
+    NATIVES, NativeFunction, NativeObject, Vec, arithmetic_error, call_native
+    , invoke_native, stringify
+)
+from .returnable import Return
+from .rope import STRINGS, concat
+
+NUMERIC_OPS = {
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.MINUS: operator.sub,
+    TokenType.STAR: operator.mul,
+}
+
+def number_error(token, *operands):
+    if (message := arithmetic_error(operands)) is not None:
+        error(token.line, message)
+
+class CompiledFunction(Callable):
+    def __init__(
+        self, name, arity, body, closure, is_initializer, qualname=None
+    ):
+        self.name = name
+        self.arity_ = arity
+        self.body = body
+        self.closure = closure
+        self.is_initializer = is_initializer
+        # Methods are qualified by their class, for the profiler.
+        self.qualname = qualname or name
+
+    def __str__(self):
+        return f'<fun {self.name}>'
+
+    def arity(self):
+        return self.arity_
+
+    def call(self, interpreter, arguments):
+        return self.run(self.closure, arguments)
+
+    def call_method(self, interpreter, instance, arguments):
+        return self.run(Environment(self.closure, [instance]), arguments)
+
+    def run(self, closure, arguments):
+        completion = self.body(Environment(closure, arguments))
+
+        if self.is_initializer:
+            return closure.values[0]
+
+        if completion is not None:
+            return completion.value
+
+    def bind(self, instance):
+        return CompiledFunction(
+            self.name, self.arity_, self.body
+            , Environment(self.closure, [instance]), self.is_initializer
+            , self.qualname
+        )
+
+class ClosureInterpreter(expr.Visitor, stmt.Visitor):
+    stringify = staticmethod(stringify)
+
+    def __init__(self):
+        self.globals = g = Globals()
+
+        for name, fn in NATIVES.items():
+            g.define(name, fn)
+
+    def interpret(self, statements, stats=None):
+        if stats is not None:
+            with stats.phase('execute'), stats.counting(self):
+                return self.interpret(statements)
+
+        compiled = [self.compile(statement) for statement in statements]
+        for statement in compiled:
+            statement(self.globals)
+
+    def compile(self, node):
+        return node.accept(self)
+
+    def sequence(self, statements):
+        compiled = [self.compile(statement) for statement in statements]
+        if 1 == len(compiled):
+            return compiled[0]
+
+        def run(env):
+            for statement in compiled:
+                if (completion := statement(env)) is not None:
+                    return completion
+        return run
+
+    def read(self, e):
+        slot = e.slot
+        match e.depth:
+            case None:
+                return None
+            case 0:
+                return lambda env: env.values[slot]
+            case 1:
+                return lambda env: env.enclosing.values[slot]
+            case distance:
+                return lambda env: env.ancestor(distance).values[slot]
+
+    def visit_assign_expr(self, e):
+        value = self.compile(e.value)
+        name = e.name
+
+        slot = e.slot
+        match e.depth:
+            case None:
+                assign_at = self.globals.assign_at
+                global_slot = Globals.slot(name.lexeme)
+                def evaluate(env):
+                    assign_at(global_slot, name, v := value(env))
+                    return v
+            case 0:
+                def evaluate(env):
+                    env.values[slot] = v = value(env)
+                    return v
+            case distance:
+                def evaluate(env):
+                    env.ancestor(distance).values[slot] = v = value(env)
+                    return v
+        return evaluate
+
+    def visit_binary_expr(self, e):
+        left = self.compile(e.left)
+        right = self.compile(e.right)
+        op = e.operator
+
+        match op.type:
+            case TokenType.PLUS:
+                # Out of evaluate, to keep its frame as small as it can be.
+                def add(a, b):
+                    if isinstance(a, STRINGS) and isinstance(b, STRINGS):
+                        return concat(a, b)
+                    if not (isinstance(a, Vec) or isinstance(b, Vec)):
+                        error(op.line
+                            , 'Operands must be two numbers or two strings')
+                    number_error(op, a, b)
+                    return a + b
+
+                def evaluate(env):
+                    a = left(env)
+                    b = right(env)
+                    if isinstance(a, float) and isinstance(b, float):
+                        return a + b
+                    return add(a, b)
+            case TokenType.SLASH:
+                def divide_vectors(a, b):
+                    # A Vec divided by zero gives inf or nan in each element.
+                    number_error(op, a, b)
+                    return a / b
+
+                def evaluate(env):
+                    a = left(env)
+                    b = right(env)
+                    if not (isinstance(a, float) and isinstance(b, float)):
+                        return divide_vectors(a, b)
+                    if b == 0.0:
+                        error(op.line, 'Division by zero')
+                    return a / b
+            case TokenType.EQUAL_EQUAL:
+                def evaluate(env):
+                    a = left(env)
+                    b = right(env)
+                    return b is None if a is None else a == b
+            case TokenType.BANG_EQUAL:
+                def evaluate(env):
+                    a = left(env)
+                    b = right(env)
+                    return b is not None if a is None else not a == b
+            case _:
+                fn = NUMERIC_OPS[op.type]
+                def evaluate(env):
+                    a = left(env)
+                    b = right(env)
+                    if isinstance(a, float) and isinstance(b, float):
+                        return fn(a, b)
+                    number_error(op, a, b)
+                    return fn(a, b)
+        return evaluate
+
+    def visit_call_expr(self, e):
+        if type(e.callee) is expr.Get:
+            return self.compile_invoke(e)
+
+        callee = self.compile(e.callee)
+        arguments = [self.compile(arg) for arg in e.arguments]
+        paren = e.paren
+
+        def evaluate(env):
+            fn = callee(env)
+            args = [arg(env) for arg in arguments]
+
+            if not isinstance(fn, Callable):
+                error(paren.line, 'Can only call functions and classes')
+
+            if len(args) != fn.arity():
+                error(paren.line
+                    , f'Expected {fn.arity()} arguments, got {len(args)}')
+
+            if type(fn) is NativeFunction:
+                return call_native(fn, self, args, paren.line)
+
+            return fn.call(self, args)
+        return evaluate
+
+    def compile_invoke(self, e):
+        obj = self.compile(e.callee.object)
+        get, find = self.property_lookup(e.callee.name)
+        name = e.callee.name
+        arguments = [self.compile(arg) for arg in e.arguments]
+        paren = e.paren
+
+        def evaluate(env):
+            o = obj(env)
+            if isinstance(o, Instance):
+                slot, fn = find(o)
+                if slot is None:
+                    args = [arg(env) for arg in arguments]
+                    if len(args) != fn.arity_:
+                        error(paren.line, f'Expected {fn.arity_} arguments'
+                            f', got {len(args)}')
+
+                    return fn.call_method(self, o, args)
+            elif isinstance(o, NativeObject):
+                method = o.find(name)
+                return invoke_native(o, method, self
+                    , [arg(env) for arg in arguments], paren.line)
+
+            fn = get(o)
+            args = [arg(env) for arg in arguments]
+
+            if not isinstance(fn, Callable):
+                error(paren.line, 'Can only call functions and classes')
+
+            if len(args) != fn.arity():
+                error(paren.line
+                    , f'Expected {fn.arity()} arguments, got {len(args)}')
+
+            if type(fn) is NativeFunction:
+                return call_native(fn, self, args, paren.line)
+
+            return fn.call(self, args)
+        return evaluate
+
+    def property_lookup(self, name):
+        lexeme = name.lexeme
+        # Inline cache: where the property was found for the last shape seen
+        # at this site, either a field's slot or a method.
+        cached_shape = cached_slot = cached_method = None
+
+        def find(o):
+            nonlocal cached_shape, cached_slot, cached_method
+            if o.shape is not cached_shape:
+                slot = o.shape.slots.get(lexeme)
+                method = None
+                if slot is None:
+                    method = o.shape.klass.find_method(lexeme)
+                    if method is None:
+                        error(name.line, f"Undefined property '{lexeme}'")
+                cached_shape, cached_slot, cached_method = o.shape, slot, method
+
+            return cached_slot, cached_method
+
+        def get(o):
+            if not isinstance(o, Instance):
+                if isinstance(o, NativeObject):
+                    return o.get(name)
+                error(name.line, 'Only instances have properties')
+
+            slot, method = find(o)
+            if slot is not None:
+                return o.values[slot]
+
+            return method.bind(o)
+
+        return get, find
+
+    def visit_get_expr(self, e):
+        obj = self.compile(e.object)
+        get, _ = self.property_lookup(e.name)
+        return lambda env: get(obj(env))
+
+    def visit_grouping_expr(self, e):
+        return self.compile(e.expression)
+
+    def visit_literal_expr(self, e):
+        value = e.value
+        return lambda env: value
+
+    def visit_logical_expr(self, e):
+        left = self.compile(e.left)
+        right = self.compile(e.right)
+
+        if e.operator.type == TokenType.OR:
+            def evaluate(env):
+                if (v := left(env)) is None or v is False:
+                    return right(env)
+                return v
+        else:
+            def evaluate(env):
+                if (v := left(env)) is None or v is False:
+                    return v
+                return right(env)
+        return evaluate
+
+    def visit_set_expr(self, e):
+        obj = self.compile(e.object)
+        value = self.compile(e.value)
+        name = e.name
+        lexeme = name.lexeme
+        # Inline cache: the field's slot for the last shape seen at this site
+        # and the shape the instance has after the assignment.
+        cached_shape = cached_slot = cached_transition = None
+
+        def evaluate(env):
+            nonlocal cached_shape, cached_slot, cached_transition
+            o = obj(env)
+            if not isinstance(o, Instance):
+                error(name.line, 'Only instances have fields')
+
+            v = value(env)
+            if o.shape is not cached_shape:
+                cached_shape = o.shape
+                cached_slot = cached_shape.slots.get(lexeme)
+                cached_transition = (
+                    cached_shape if cached_slot is not None
+                    else cached_shape.add(lexeme)
+                )
+
+            if cached_transition is cached_shape:
+                o.values[cached_slot] = v
+            else:
+                o.shape = cached_transition
+                o.values.append(v)
+            return v
+        return evaluate
+
+    def visit_super_expr(self, e):
+        distance = e.depth
+        method = e.method
+
+        def evaluate(env):
+            superclass = env.ancestor(distance).values[0]
+            obj = env.ancestor(distance - 1).values[0]
+            fn = superclass.find_method(method.lexeme)
+
+            if fn is None:
+                error(method.line, f"Undefined property '{method.lexeme}'")
+
+            return fn.bind(obj)
+        return evaluate
+
+    def visit_this_expr(self, e):
+        return self.read(e)
+
+    def visit_unary_expr(self, e):
+        right = self.compile(e.right)
+        op = e.operator
+
+        if op.type == TokenType.BANG:
+            return lambda env: (v := right(env)) is None or v is False
+
+        def evaluate(env):
+            v = right(env)
+            if not isinstance(v, float):
+                number_error(op, v)
+            return -v
+        return evaluate
+
+    def visit_variable_expr(self, e):
+        if (read := self.read(e)) is not None:
+            return read
+
+        name = e.name
+        get_at = self.globals.get_at
+        slot = Globals.slot(name.lexeme)
+        return lambda env: get_at(slot, name)
+
+    def visit_block_stmt(self, s):
+        body = self.sequence(s.statements)
+        return lambda env: body(Environment(env))
+
+    def visit_class_stmt(self, s):
+        superclass = self.compile(s.superclass) if s.superclass else None
+        superclass_name = s.superclass.name if s.superclass else None
+        lexeme = s.name.lexeme
+        methods = [
+            (
+                method.name.lexeme
+                , len(method.parameters)
+                , self.sequence(method.body)
+            )
+            for method in s.methods
+        ]
+
+        def execute(env):
+            base = None
+            if superclass is not None:
+                base = superclass(env)
+                if not isinstance(base, Class):
+                    error(superclass_name.line, 'Superclass must be a class')
+
+            closure = env
+            if base is not None:
+                closure = Environment(env, [base])
+
+            env.define(lexeme, Class(lexeme, base, {
+                method_name: CompiledFunction(
+                    method_name, arity, body, closure, 'init' == method_name
+                    , f'{lexeme}.{method_name}'
+                )
+                for method_name, arity, body in methods
+            }))
+        return execute
+
+    def visit_expression_stmt(self, s):
+        expression = self.compile(s.expression)
+
+        def execute(env):
+            expression(env)
+        return execute
+
+    def visit_function_stmt(self, s):
+        lexeme = s.name.lexeme
+        arity = len(s.parameters)
+        body = self.sequence(s.body)
+
+        def execute(env):
+            env.define(lexeme, CompiledFunction(lexeme, arity, body, env, False))
+        return execute
+
+    def visit_if_stmt(self, s):
+        condition = self.compile(s.condition)
+        then_branch = self.compile(s.then_branch)
+
+        if s.else_branch is None:
+            def execute(env):
+                if (v := condition(env)) is not None and v is not False:
+                    return then_branch(env)
+        else:
+            else_branch = self.compile(s.else_branch)
+            def execute(env):
+                if (v := condition(env)) is not None and v is not False:
+                    return then_branch(env)
+                return else_branch(env)
+        return execute
+
+    def visit_print_stmt(self, s):
+        expression = self.compile(s.expression)
+        stringify = self.stringify
+        return lambda env: print(stringify(expression(env)))
+
+    def visit_return_stmt(self, s):
+        if s.value is None:
+            def execute(env):
+                return Return(None)
+        else:
+            value = self.compile(s.value)
+            def execute(env):
+                return Return(value(env))
+        return execute
+
+    def visit_var_stmt(self, s):
+        lexeme = s.name.lexeme
+
+        if s.initializer is None:
+            return lambda env: env.define(lexeme, None)
+
+        initializer = self.compile(s.initializer)
+        return lambda env: env.define(lexeme, initializer(env))
+
+    def visit_while_stmt(self, s):
+        condition = self.compile(s.condition)
+        body = self.compile(s.body)
+
+        def execute(env):
+            while (v := condition(env)) is not None and v is not False:
+                if (completion := body(env)) is not None:
+                    return completion
+        return execute
@@ -0,0 +1,356 @@
+from .ast import expr, stmt
+from .lex import TokenType
+from .resolve import FunctionType
+
+(
+    CONSTANT, NIL, TRUE, FALSE, POP,
+    GET_LOCAL, SET_LOCAL, GET_UPVALUE, SET_UPVALUE,
+    GET_GLOBAL, SET_GLOBAL, DEFINE_GLOBAL,
+    GET_PROPERTY, CHECK_FIELDS, SET_PROPERTY, GET_SUPER,
+    EQUAL, NOT_EQUAL, GREATER, GREATER_EQUAL, LESS, LESS_EQUAL,
+    ADD, SUBTRACT, MULTIPLY, DIVIDE, NOT, NEGATE,
+    PRINT, JUMP, JUMP_IF_FALSE, CALL, CLOSURE, CLOSE_UPVALUE, RETURN,
+    INHERIT, CLASS,
+) = range(37)
+
+BINARY_OPS = {
+    TokenType.BANG_EQUAL: NOT_EQUAL,
+    TokenType.EQUAL_EQUAL: EQUAL,
+    TokenType.GREATER: GREATER,
+    TokenType.GREATER_EQUAL: GREATER_EQUAL,
+    TokenType.LESS: LESS,
+    TokenType.LESS_EQUAL: LESS_EQUAL,
+    TokenType.MINUS: SUBTRACT,
+    TokenType.PLUS: ADD,
+    TokenType.SLASH: DIVIDE,
+    TokenType.STAR: MULTIPLY,
+}
+
+class Chunk:
+    def __init__(self):
+        self.code = []
+        self.constants = []
+        self.lines = []
+
+class Prototype:
+    def __init__(self, name, arity, is_initializer, qualname=None):
+        self.name = name
+        self.arity = arity
+        self.is_initializer = is_initializer
+        # Methods are qualified by their class, for the profiler.
+        self.qualname = qualname or name
+        self.upvalue_count = 0
+        self.chunk = Chunk()
+
+class Local:
+    def __init__(self, name, depth):
+        self.name = name
+        self.depth = depth
+        self.is_captured = False
+
+class FunctionState:
+    def __init__(self, enclosing, proto, function_type):
+        self.enclosing = enclosing
+        self.proto = proto
+        self.type = function_type
+        self.upvalues = []
+        self.scope_depth = 0
+
+        # Slot zero holds the receiver for methods and the callee otherwise.
+        receiver = ''
+        if function_type in (FunctionType.METHOD, FunctionType.INITIALIZER):
+            receiver = 'this'
+        self.locals = [Local(receiver, 0)]
+
+class Compiler(expr.Visitor, stmt.Visitor):
+    def __init__(self):
+        self.state = None
+        self.line = 0
+
+    def compile(self, statements):
+        self.state = FunctionState(
+            None, Prototype('script', 0, False), FunctionType.NONE
+        )
+        for statement in statements:
+            self.compile_stmt(statement)
+        self.emit_return()
+
+        return self.state.proto
+
+    def compile_stmt(self, s):
+        s.accept(self)
+
+    def compile_expr(self, e):
+        e.accept(self)
+
+    def emit(self, *code, line=None):
+        if line is not None:
+            self.line = line
+
+        chunk = self.state.proto.chunk
+        chunk.code.extend(code)
+        chunk.lines.extend([self.line] * len(code))
+
+    def emit_jump(self, op, line=None):
+        self.emit(op, -1, line=line)
+        return len(self.state.proto.chunk.code) - 1
+
+    def patch_jump(self, at):
+        code = self.state.proto.chunk.code
+        code[at] = len(code)
+
+    def emit_return(self):
+        if FunctionType.INITIALIZER == self.state.type:
+            self.emit(GET_LOCAL, 0)
+        else:
+            self.emit(NIL)
+        self.emit(RETURN)
+
+    def constant(self, value):
+        constants = self.state.proto.chunk.constants
+        constants.append(value)
+        return len(constants) - 1
+
+    def begin_scope(self):
+        self.state.scope_depth += 1
+
+    def end_scope(self):
+        state = self.state
+        state.scope_depth -= 1
+
+        locals_ = state.locals
+        while locals_ and locals_[-1].depth > state.scope_depth:
+            self.emit(CLOSE_UPVALUE if locals_.pop().is_captured else POP)
+
+    def add_local(self, name):
+        self.state.locals.append(Local(name, self.state.scope_depth))
+
+    def resolve_local(self, state, name):
+        for slot in range(len(state.locals) - 1, -1, -1):
+            if state.locals[slot].name == name:
+                return slot
+
+        return -1
+
+    def add_upvalue(self, state, index, is_local):
+        upvalue = (is_local, index)
+        if upvalue in state.upvalues:
+            return state.upvalues.index(upvalue)
+
+        state.upvalues.append(upvalue)
+        state.proto.upvalue_count = len(state.upvalues)
+        return len(state.upvalues) - 1
+
+    def resolve_upvalue(self, state, name):
+        if state.enclosing is None:
+            return -1
+
+        local = self.resolve_local(state.enclosing, name)
+        if local != -1:
+            state.enclosing.locals[local].is_captured = True
+            return self.add_upvalue(state, local, 1)
+
+        upvalue = self.resolve_upvalue(state.enclosing, name)
+        if upvalue != -1:
+            return self.add_upvalue(state, upvalue, 0)
+
+        return -1
+
+    def named_variable(self, name, line, set_=False):
+        if (arg := self.resolve_local(self.state, name)) != -1:
+            op = SET_LOCAL if set_ else GET_LOCAL
+        elif (arg := self.resolve_upvalue(self.state, name)) != -1:
+            op = SET_UPVALUE if set_ else GET_UPVALUE
+        else:
+            arg = self.constant(name)
+            op = SET_GLOBAL if set_ else GET_GLOBAL
+
+        self.emit(op, arg, line=line)
+
+    def define_variable(self, name):
+        if self.state.scope_depth > 0:
+            self.add_local(name.lexeme)
+        else:
+            self.emit(DEFINE_GLOBAL, self.constant(name.lexeme), line=name.line)
+
+    def function(self, s, function_type, qualname=None):
+        proto = Prototype(
+            s.name.lexeme, len(s.parameters)
+            , FunctionType.INITIALIZER == function_type, qualname
+        )
+        self.state = state = FunctionState(self.state, proto, function_type)
+        self.begin_scope()
+        for param in s.parameters:
+            self.add_local(param.lexeme)
+        for statement in s.body:
+            self.compile_stmt(statement)
+        self.emit_return()
+        self.state = state.enclosing
+
+        self.emit(CLOSURE, self.constant(proto), line=s.name.line)
+        for is_local, index in state.upvalues:
+            self.emit(is_local, index)
+
+    def visit_assign_expr(self, e):
+        self.compile_expr(e.value)
+        self.named_variable(e.name.lexeme, e.name.line, True)
+
+    def visit_binary_expr(self, e):
+        self.compile_expr(e.left)
+        self.compile_expr(e.right)
+        self.emit(BINARY_OPS[e.operator.type], line=e.operator.line)
+
+    def visit_call_expr(self, e):
+        self.compile_expr(e.callee)
+        for arg in e.arguments:
+            self.compile_expr(arg)
+        self.emit(CALL, len(e.arguments), line=e.paren.line)
+
+    def visit_get_expr(self, e):
+        self.compile_expr(e.object)
+        self.emit(GET_PROPERTY, self.constant(e.name), line=e.name.line)
+
+    def visit_grouping_expr(self, e):
+        self.compile_expr(e.expression)
+
+    def visit_literal_expr(self, e):
+        if e.value is None:
+            self.emit(NIL)
+        elif e.value is True:
+            self.emit(TRUE)
+        elif e.value is False:
+            self.emit(FALSE)
+        else:
+            self.emit(CONSTANT, self.constant(e.value))
+
+    def visit_logical_expr(self, e):
+        self.compile_expr(e.left)
+
+        if e.operator.type == TokenType.OR:
+            else_jump = self.emit_jump(JUMP_IF_FALSE)
+            end_jump = self.emit_jump(JUMP)
+            self.patch_jump(else_jump)
+        else:
+            end_jump = self.emit_jump(JUMP_IF_FALSE)
+
+        self.emit(POP)
+        self.compile_expr(e.right)
+        self.patch_jump(end_jump)
+
+    def visit_set_expr(self, e):
+        # The target is checked before the value is evaluated, just like
+        # Interpreter.visit_set_expr does.
+        self.compile_expr(e.object)
+        self.emit(CHECK_FIELDS, line=e.name.line)
+        self.compile_expr(e.value)
+        self.emit(SET_PROPERTY, self.constant(e.name), line=e.name.line)
+
+    def visit_super_expr(self, e):
+        self.named_variable('this', e.keyword.line)
+        self.named_variable('super', e.keyword.line)
+        self.emit(GET_SUPER, self.constant(e.method), line=e.method.line)
+
+    def visit_this_expr(self, e):
+        self.named_variable('this', e.keyword.line)
+
+    def visit_unary_expr(self, e):
+        self.compile_expr(e.right)
+        self.emit(
+            NOT if e.operator.type == TokenType.BANG else NEGATE
+            , line=e.operator.line
+        )
+
+    def visit_variable_expr(self, e):
+        self.named_variable(e.name.lexeme, e.name.line)
+
+    def visit_block_stmt(self, s):
+        self.begin_scope()
+        for statement in s.statements:
+            self.compile_stmt(statement)
+        self.end_scope()
+
+    def visit_class_stmt(self, s):
+        is_local = self.state.scope_depth > 0
+        if is_local:
+            self.emit(NIL, line=s.name.line)
+            self.add_local(s.name.lexeme)
+            slot = len(self.state.locals) - 1
+
+        if s.superclass is not None:
+            self.visit_variable_expr(s.superclass)
+            self.emit(INHERIT, line=s.superclass.name.line)
+            self.begin_scope()
+            self.add_local('super')
+
+        for method in s.methods:
+            self.function(method
+                , FunctionType.INITIALIZER if 'init' == method.name.lexeme
+                else FunctionType.METHOD
+                , f'{s.name.lexeme}.{method.name.lexeme}'
+            )
+
+        self.emit(CLASS, self.constant(s.name.lexeme), len(s.methods)
+            , int(s.superclass is not None), line=s.name.line
+        )
+
+        if is_local:
+            self.emit(SET_LOCAL, slot, POP)
+        else:
+            self.emit(DEFINE_GLOBAL, self.constant(s.name.lexeme))
+
+        if s.superclass is not None:
+            self.end_scope()
+
+    def visit_expression_stmt(self, s):
+        self.compile_expr(s.expression)
+        self.emit(POP)
+
+    def visit_function_stmt(self, s):
+        if self.state.scope_depth > 0:
+            # Define first so that the function can refer to itself.
+            self.add_local(s.name.lexeme)
+            self.function(s, FunctionType.FUNCTION)
+        else:
+            self.function(s, FunctionType.FUNCTION)
+            self.define_variable(s.name)
+
+    def visit_if_stmt(self, s):
+        self.compile_expr(s.condition)
+        else_jump = self.emit_jump(JUMP_IF_FALSE)
+        self.emit(POP)
+        self.compile_stmt(s.then_branch)
+        end_jump = self.emit_jump(JUMP)
+        self.patch_jump(else_jump)
+        self.emit(POP)
+        if s.else_branch is not None:
+            self.compile_stmt(s.else_branch)
+        self.patch_jump(end_jump)
+
+    def visit_print_stmt(self, s):
+        self.compile_expr(s.expression)
+        self.emit(PRINT)
+
+    def visit_return_stmt(self, s):
+        if s.value is None:
+            self.emit_return()
+        else:
+            self.compile_expr(s.value)
+            self.emit(RETURN)
+
+    def visit_var_stmt(self, s):
+        if s.initializer is not None:
+            self.compile_expr(s.initializer)
+        else:
+            self.emit(NIL, line=s.name.line)
+
+        self.define_variable(s.name)
+
+    def visit_while_stmt(self, s):
+        loop_start = len(self.state.proto.chunk.code)
+        self.compile_expr(s.condition)
+        exit_jump = self.emit_jump(JUMP_IF_FALSE)
+        self.emit(POP)
+        self.compile_stmt(s.body)
+        self.emit(JUMP, loop_start)
+        self.patch_jump(exit_jump)
+        self.emit(POP)
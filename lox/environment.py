@@ -1,12 +1,15 @@
 from .error import error
 
 class Environment:
-    def __init__(self, enclosing=None):
-        self.values = {}
+    __slots__ = ('values', 'enclosing')
+
+    def __init__(self, enclosing=None, values=None):
+        self.values = [] if values is None else values
         self.enclosing = enclosing
 
     def define(self, name, value):
-        self.values[name] = value
+        # Locals are defined in the order the Resolver numbered them.
+        self.values.append(value)
 
     def ancestor(self, distance):
         env = self
@@ -15,28 +18,63 @@ class Environment:
 
         return env
 
-    def assign_at(self, distance, name, value):
-        self.ancestor(distance).values[name.lexeme] = value
+    def assign_at(self, distance, slot, value):
+        env = self
+        for _ in range(distance):
+            env = env.enclosing
+
+        env.values[slot] = value
+
+    def get_at(self, distance, slot):
+        env = self
+        for _ in range(distance):
+            env = env.enclosing
+
+        return env.values[slot]
+
+# Marks a global slot whose name has not been defined in this Globals.
+UNDEFINED = object()
+
+class Globals:
+    # Global names are numbered once for the whole process, so a slot cached
+    # where a name is used is valid in every Globals.
+    slots = {}
+
+    def __init__(self):
+        self.values = []
+        self.enclosing = None
+
+    @classmethod
+    def slot(cls, name):
+        if name not in cls.slots:
+            cls.slots[name] = len(cls.slots)
 
-    def get_at(self, distance, name):
-        return self.ancestor(distance).values.get(name)
+        return cls.slots[name]
+
+    def define(self, name, value):
+        slot = self.slot(name)
+        if slot >= len(self.values):
+            self.values.extend([UNDEFINED] * (slot + 1 - len(self.values)))
+
+        self.values[slot] = value
 
     def get(self, name):
-        if name.lexeme in self.values:
-            return self.values[name.lexeme]
+        return self.get_at(self.slot(name.lexeme), name)
 
-        if self.enclosing is not None:
-            return self.enclosing.get(name)
+    def get_at(self, slot, name):
+        if slot < len(self.values):
+            value = self.values[slot]
+            if value is not UNDEFINED:
+                return value
 
         self.error(name, f"Undefined variable '{name.lexeme}'")
 
     def assign(self, name, value):
-        if name.lexeme in self.values:
-            self.values[name.lexeme] = value
-            return
+        self.assign_at(self.slot(name.lexeme), name, value)
 
-        if self.enclosing is not None:
-            self.enclosing.assign(name, value)
+    def assign_at(self, slot, name, value):
+        if slot < len(self.values) and self.values[slot] is not UNDEFINED:
+            self.values[slot] = value
             return
 
         self.error(name, f"Undefined variable '{name.lexeme}'")
@@ -1,12 +1,13 @@
 from .callable import Callable
 from .environment import Environment
-from .returnable import Return
 
 class Function(Callable):
-    def __init__(self, declaration, closure, is_initializer):
+    def __init__(self, declaration, closure, is_initializer, qualname=None):
         self.declaration = declaration
         self.closure = closure
         self.is_initializer = is_initializer
+        # Methods are qualified by their class, for the profiler.
+        self.qualname = qualname or declaration.name.lexeme
 
     def __str__(self):
         return f'<fun {self.declaration.name.lexeme}>'
@@ -15,21 +16,28 @@ class Function(Callable):
         return len(self.declaration.parameters)
 
     def call(self, interpreter, arguments):
-        env = Environment(self.closure)
-        for i in range(len(self.declaration.parameters)):
-            env.define(self.declaration.parameters[i].lexeme, arguments[i])
+        return self.run(interpreter, self.closure, arguments)
 
-        try:
-            interpreter.execute_block(self.declaration.body, env)
-        except Return as R:
-            if self.is_initializer:
-                return self.closure.get_at(0, 'this')
-            return R.value
+    def call_method(self, interpreter, instance, arguments):
+        # Same as bind(instance).call(...) without the bound Function.
+        return self.run(
+            interpreter, Environment(self.closure, [instance]), arguments
+        )
+
+    def run(self, interpreter, closure, arguments):
+        # The parameters occupy the first slots of the function's scope.
+        env = Environment(closure, arguments)
+
+        completion = interpreter.execute_block(self.declaration.body, env)
 
         if self.is_initializer:
-            return self.closure.get_at(0, 'this')
+            return closure.values[0]
+
+        if completion is not None:
+            return completion.value
 
     def bind(self, instance):
-        env = Environment(self.closure)
-        env.define('this', instance)
-        return Function(self.declaration, env, self.is_initializer)
+        env = Environment(self.closure, [instance])
+        return Function(
+            self.declaration, env, self.is_initializer, self.qualname
+        )
@@ -1,19 +1,45 @@
 from .error import error
 
+class Shape:
+    # Maps field names to their index in an instance's values. Instances of
+    # a class that gain the same fields in the same order share shapes.
+    __slots__ = ('klass', 'slots', 'transitions')
+
+    def __init__(self, klass, slots=None):
+        self.klass = klass
+        self.slots = {} if slots is None else slots
+        self.transitions = {}
+
+    def add(self, name):
+        # The shape after adding a field that isn't in this one.
+        if name not in self.transitions:
+            self.transitions[name] = Shape(
+                self.klass, {**self.slots, name: len(self.slots)}
+            )
+
+        return self.transitions[name]
+
 class Instance:
+    __slots__ = ('shape', 'values')
+
     def __init__(self, klass):
-        self.klass = klass
-        self.fields = {}
+        self.shape = klass.shape
+        self.values = []
 
     def __str__(self):
         return f'{self.klass} instance'
 
+    @property
+    def klass(self):
+        return self.shape.klass
+
     def error(self, token, msg):
         error(token.line, msg)
 
     def get(self, name):
-        if name.lexeme in self.fields:
-            return self.fields[name.lexeme]
+        slot = self.shape.slots.get(name.lexeme)
+        if slot is not None:
+            return self.values[slot]
 
         method = self.klass.find_method(name.lexeme)
         if method is not None:
@@ -22,4 +48,9 @@ class Instance:
         self.error(name, f"Undefined property '{name.lexeme}'")
 
     def set(self, name, value):
-        self.fields[name.lexeme] = value
+        slot = self.shape.slots.get(name.lexeme)
+        if slot is None:
+            self.shape = self.shape.add(name.lexeme)
+            self.values.append(value)
+        else:
+            self.values[slot] = value
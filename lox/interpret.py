@@ -1,53 +1,37 @@
-from time import monotonic
-
-from .ast import expr, stmt
+from .ast import expr, fused, stmt
 from .callable import Callable
 from .classes import Class
-from .environment import Environment
+from .environment import Environment, Globals
 from .error import error
 from .function import Function
 from .instance import Instance
 from .lex import TokenType
+from .natives import (
+    NATIVES, NativeFunction, NativeObject, Vec, arithmetic_error, call_native
+    , invoke_native, stringify
+)
+from .optimize import ARITHMETIC
 from .returnable import Return
+from .rope import STRINGS, concat
+from .specialize import Specializer
 
-class _Clock(Callable):
-    def __str__(self):
-        return '<native fun clock>'
-
-    def arity(self):
-        return 0
-
-    def call(self, interpreter, arguments):
-        return monotonic()
-
-class Interpreter(expr.Visitor, stmt.Visitor):
+class Interpreter(expr.Visitor, stmt.Visitor, fused.Visitor):
     def __init__(self):
-        self.globals = g = Environment()
+        self.globals = g = Globals()
         self.environment = g
-        self.locals = {}
-
-        g.define('clock', _Clock())
-
-    def interpret(self, statements):
-        for statement in statements:
-            self.execute(statement)
 
-    def stringify(self, x):
-        if x is None:
-            return 'nil'
+        for name, fn in NATIVES.items():
+            g.define(name, fn)
 
-        s = str(x)
+    def interpret(self, statements, stats=None):
+        if stats is not None:
+            with stats.phase('execute'), stats.counting(self):
+                return self.interpret(statements)
 
-        if 'True' == s:
-            return 'true'
-
-        if 'False' == s:
-            return 'false'
-
-        if isinstance(x, float) and s.endswith('.0'):
-            return s[:-2]
+        for statement in Specializer().optimize(statements):
+            self.execute(statement)
 
-        return s
+    stringify = staticmethod(stringify)
 
     def error(self, token, msg):
         error(token.line, msg)
@@ -73,14 +57,27 @@ class Interpreter(expr.Visitor, stmt.Visitor):
             self.error(e.name, 'Only instances have fields')
 
         value = self.evaluate(e.value)
-        obj.set(e.name, value)
+
+        # Each Set site remembers the field's slot for the last shape seen
+        # there and the shape the instance has after the assignment.
+        if e.shape is not obj.shape:
+            e.shape = obj.shape
+            e.slot = e.shape.slots.get(e.name.lexeme)
+            e.transition = (
+                e.shape if e.slot is not None else e.shape.add(e.name.lexeme)
+            )
+
+        if e.transition is e.shape:
+            obj.values[e.slot] = value
+        else:
+            obj.shape = e.transition
+            obj.values.append(value)
 
         return value
 
     def visit_super_expr(self, e):
-        distance = self.locals.get(e)
-        superclass = self.environment.get_at(distance, 'super')
-        obj = self.environment.get_at(distance - 1, 'this')
+        superclass = self.environment.get_at(e.depth, 0)
+        obj = self.environment.get_at(e.depth - 1, 0)
         method = superclass.find_method(e.method.lexeme)
 
         if method is None:
@@ -98,10 +95,7 @@ class Interpreter(expr.Visitor, stmt.Visitor):
         return e.accept(self)
 
     def execute(self, s):
-        s.accept(self)
-
-    def resolve(self, e, depth):
-        self.locals[e] = depth
+        return s.accept(self)
 
     def execute_block(self, statements, environment):
         previous_env = self.environment
@@ -109,14 +103,14 @@ class Interpreter(expr.Visitor, stmt.Visitor):
             # Switching out the environment is hacky...
             self.environment = environment
             for statement in statements:
-                self.execute(statement)
+                if (completion := self.execute(statement)) is not None:
+                    return completion
         finally:
             self.environment = previous_env
 
     def check_number_operands(self, op, *operands):
-        for operand in operands:
-            if not isinstance(operand, float):
-                self.error(op, f'Operand must be a number: {operand}')
+        if (message := arithmetic_error(operands)) is not None:
+            self.error(op, message)
 
     def visit_unary_expr(self, e):
         right = self.evaluate(e.right)
@@ -137,7 +131,36 @@ class Interpreter(expr.Visitor, stmt.Visitor):
     def visit_binary_expr(self, e):
         left = self.evaluate(e.left)
         right = self.evaluate(e.right)
-        match e.operator.type:
+
+        # Quickened: the operands have the types seen the last time through.
+        if type(left) is e.left_type and type(right) is e.right_type:
+            try:
+                return e.fast(left, right)
+            except ZeroDivisionError:
+                self.error(e.operator, 'Division by zero')
+
+        return self.binary(e, left, right)
+
+    def binary(self, e, left, right):
+        # Specialize the node to these operand types if they are ones its
+        # operator takes, or go back to the generic path if they aren't.
+        op = e.operator.type
+        if op in ARITHMETIC and type(left) is float and type(right) is float:
+            e.fast = ARITHMETIC[op]
+        elif (
+            TokenType.PLUS == op
+            and type(left) in STRINGS and type(right) in STRINGS
+        ):
+            e.fast = concat
+        else:
+            e.fast = None
+
+        if e.fast is None:
+            e.left_type = e.right_type = None
+        else:
+            e.left_type, e.right_type = type(left), type(right)
+
+        match op:
             case TokenType.GREATER:
                 self.check_number_operands(e.operator, left, right)
                 return left > right
@@ -160,14 +183,18 @@ class Interpreter(expr.Visitor, stmt.Visitor):
             case TokenType.PLUS:
                 if isinstance(left, float) and isinstance(right, float):
                     return left + right
-                if isinstance(left, str) and isinstance(right, str):
+                if isinstance(left, STRINGS) and isinstance(right, STRINGS):
+                    return concat(left, right)
+                if isinstance(left, Vec) or isinstance(right, Vec):
+                    self.check_number_operands(e.operator, left, right)
                     return left + right
                 self.error(
                     e.operator, 'Operands must be two numbers or two strings'
                 )
             case TokenType.SLASH:
                 self.check_number_operands(e.operator, left, right)
-                if right == 0.0:
+                # A Vec divided by zero gives inf or nan in each element.
+                if right == 0.0 and not isinstance(left, Vec):
                     self.error(e.operator, 'Division by zero')
                 return left / right
             case TokenType.STAR:
@@ -175,7 +202,31 @@ class Interpreter(expr.Visitor, stmt.Visitor):
                 return left * right
 
     def visit_call_expr(self, e):
-        callee = self.evaluate(e.callee)
+        if type(e.callee) is expr.Get:
+            get = e.callee
+            obj = self.evaluate(get.object)
+            if isinstance(obj, Instance):
+                if get.shape is not obj.shape:
+                    self.find_property(get, obj)
+
+                if get.slot is None:
+                    # Method call: invoke it with this bound directly.
+                    method = get.method
+                    arguments = [self.evaluate(arg) for arg in e.arguments]
+                    if len(arguments) != method.arity():
+                        self.error(e.paren
+                            , f'Expected {method.arity()} arguments'
+                            f', got {len(arguments)}')
+
+                    return method.call_method(self, obj, arguments)
+            elif isinstance(obj, NativeObject):
+                method = obj.find(get.name)
+                return invoke_native(obj, method, self
+                    , [self.evaluate(arg) for arg in e.arguments], e.paren.line)
+
+            callee = self.get_property(get, obj)
+        else:
+            callee = self.evaluate(e.callee)
 
         arguments = []
         for arg in e.arguments:
@@ -188,31 +239,64 @@ class Interpreter(expr.Visitor, stmt.Visitor):
             self.error(e.paren
                 , f'Expected {callee.arity()} arguments, got {len(arguments)}')
 
+        if type(callee) is NativeFunction:
+            return call_native(callee, self, arguments, e.paren.line)
+
         return callee.call(self, arguments)
 
     def visit_get_expr(self, e):
-        obj = self.evaluate(e.object)
-        if isinstance(obj, Instance):
-            return obj.get(e.name)
+        return self.get_property(e, self.evaluate(e.object))
+
+    def get_property(self, e, obj):
+        if not isinstance(obj, Instance):
+            if isinstance(obj, NativeObject):
+                return obj.get(e.name)
+            self.error(e.name, 'Only instances have properties')
+
+        if e.shape is not obj.shape:
+            self.find_property(e, obj)
 
-        self.error(e.name, 'Only instances have properties')
+        if e.slot is not None:
+            return obj.values[e.slot]
+
+        return e.method.bind(obj)
+
+    def find_property(self, e, obj):
+        # Each Get site remembers where the property was found for the last
+        # shape seen there: a field's slot or, failing that, a method.
+        shape = obj.shape
+        slot = shape.slots.get(e.name.lexeme)
+        method = None
+        if slot is None:
+            method = shape.klass.find_method(e.name.lexeme)
+            if method is None:
+                self.error(e.name, f"Undefined property '{e.name.lexeme}'")
+
+        e.slot = slot
+        e.method = method
+        e.shape = shape
 
     def visit_variable_expr(self, e):
         return self.lookup_variable(e.name, e)
 
     def lookup_variable(self, name, e):
-        if (distance := self.locals.get(e)) is not None:
-            return self.environment.get_at(distance, name.lexeme)
-        else:
-            return self.globals.get(name)
+        if e.depth is not None:
+            return self.environment.get_at(e.depth, e.slot)
+
+        # A global's slot is cached on the node the first time it's run.
+        if e.slot is None:
+            e.slot = Globals.slot(name.lexeme)
+        return self.globals.get_at(e.slot, name)
 
     def visit_assign_expr(self, e):
         value = self.evaluate(e.value)
 
-        if (distance := self.locals.get(e)) is not None:
-            self.environment.assign_at(distance, e.name, value)
+        if e.depth is not None:
+            self.environment.assign_at(e.depth, e.slot, value)
         else:
-            self.globals.assign(e.name, value)
+            if e.slot is None:
+                e.slot = Globals.slot(e.name.lexeme)
+            self.globals.assign_at(e.slot, e.name, value)
 
         return value
 
@@ -223,6 +307,56 @@ class Interpreter(expr.Visitor, stmt.Visitor):
             return False
         return a == b
 
+    def visit_call_global_fused(self, f):
+        callee = self.globals.get_at(f.slot, f.generic.callee.name)
+
+        arguments = []
+        for arg in f.arguments:
+            arguments.append(self.evaluate(arg))
+
+        if not isinstance(callee, Callable):
+            self.error(f.generic.paren, 'Can only call functions and classes')
+
+        if len(arguments) != callee.arity():
+            self.error(f.generic.paren
+                , f'Expected {callee.arity()} arguments, got {len(arguments)}')
+
+        if type(callee) is NativeFunction:
+            return call_native(callee, self, arguments, f.generic.paren.line)
+
+        return callee.call(self, arguments)
+
+    def visit_compare_local_fused(self, f):
+        left = self.environment.get_at(f.depth, f.slot)
+        right = self.lookup_variable(f.right.name, f.right)
+        if type(left) is float and type(right) is float:
+            return f.compare(left, right)
+
+        return self.evaluate(f.generic)
+
+    def visit_compare_local_const_fused(self, f):
+        left = self.environment.get_at(f.depth, f.slot)
+        if type(left) is float:
+            return f.compare(left, f.constant)
+
+        return self.evaluate(f.generic)
+
+    def visit_get_path_fused(self, f):
+        obj = self.evaluate(f.object)
+        for get in f.gets:
+            obj = self.get_property(get, obj)
+
+        return obj
+
+    def visit_increment_local_fused(self, f):
+        env = self.environment.ancestor(f.depth)
+        value = env.values[f.slot]
+        if type(value) is float:
+            env.values[f.slot] = value = value + f.delta
+            return value
+
+        return self.evaluate(f.generic)
+
     def visit_expression_stmt(self, s):
         self.evaluate(s.expression)
 
@@ -235,7 +369,7 @@ class Interpreter(expr.Visitor, stmt.Visitor):
 
     def visit_return_stmt(self, s):
         value = self.evaluate(s.value) if s.value is not None else None
-        raise Return(value)
+        return Return(value)
 
     def visit_var_stmt(self, s):
         value = None
@@ -246,10 +380,11 @@ class Interpreter(expr.Visitor, stmt.Visitor):
 
     def visit_while_stmt(self, s):
         while self.is_truthy(self.evaluate(s.condition)):
-            self.execute(s.body)
+            if (completion := self.execute(s.body)) is not None:
+                return completion
 
     def visit_block_stmt(self, s):
-        self.execute_block(s.statements, Environment(self.environment))
+        return self.execute_block(s.statements, Environment(self.environment))
 
     def visit_class_stmt(self, s):
         superclass = None
@@ -258,16 +393,14 @@ class Interpreter(expr.Visitor, stmt.Visitor):
             if not isinstance(superclass, Class):
                 self.error(s.superclass.name, 'Superclass must be a class')
 
-        self.environment.define(s.name.lexeme, None)
-
         if s.superclass is not None:
-            self.environment = Environment(self.environment)
-            self.environment.define('super', superclass)
+            self.environment = Environment(self.environment, [superclass])
 
         methods = {}
         for method in s.methods:
             func = Function(
                 method, self.environment, 'init' == method.name.lexeme
+                , f'{s.name.lexeme}.{method.name.lexeme}'
             )
             methods[method.name.lexeme] = func
         klass = Class(s.name.lexeme, superclass, methods)
@@ -275,10 +408,10 @@ class Interpreter(expr.Visitor, stmt.Visitor):
         if superclass is not None:
             self.environment = self.environment.enclosing
 
-        self.environment.assign(s.name, klass)
+        self.environment.define(s.name.lexeme, klass)
 
     def visit_if_stmt(self, s):
         if self.is_truthy(self.evaluate(s.condition)):
-            self.execute(s.then_branch)
+            return self.execute(s.then_branch)
         elif s.else_branch is not None:
-            self.execute(s.else_branch)
+            return self.execute(s.else_branch)
@@ -1,5 +1,8 @@
 import enum
+import re
+import sys
 
+from array import array
 from dataclasses import dataclass
 
 from .error import error
@@ -35,7 +38,7 @@ class CodePoint(enum.IntEnum):
     LOWER_Z = ord('z')
     UNDERSCORE = ord('_')
 
-TokenType = enum.Enum('TokenType',
+TokenType = enum.IntEnum('TokenType',
     '''
     LEFT_PAREN RIGHT_PAREN LEFT_BRACE RIGHT_BRACE
     COMMA DOT MINUS PLUS SEMICOLON SLASH STAR
@@ -57,18 +60,83 @@ keywords = { k.lower().encode(): TokenType[k] for k in '''
     RETURN SUPER THIS TRUE VAR WHILE
 '''.split()}
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     type: TokenType
-    source: bytes
-    start: int
-    length: int
+    lexeme: str
     line: int
     literal: object
 
-    @property
-    def lexeme(self):
-        return self.source[self.start : self.start + self.length].decode('utf-8')
+# Tokens are kept in parallel arrays and only turned into Token objects when
+# the parser needs one for the AST or an error message. Each distinct name,
+# keyword or operator is decoded and interned once, so neither the arrays nor
+# the Tokens refer to the source. The text of a string or number is kept with
+# its token instead, so that discarding tokens frees it.
+class TokenArray:
+    def __init__(self):
+        self.types = array('B')
+        self.lexemes = array('I')
+        self.lines = array('I')
+        self.literals = {}
+        self.texts = {}
+        self.names = []
+        self.ids = {}
+        self.discarded = 0
+
+    def __len__(self):
+        return len(self.types)
+
+    def __iter__(self):
+        for i in range(len(self.types)):
+            yield self.token(i)
+
+    def add(self, type, text, line, literal=None):
+        if literal is not None:
+            self.literals[len(self.types)] = literal
+            self.texts[len(self.types)] = text.decode('utf-8')
+            id = 0
+        elif (id := self.ids.get(text)) is None:
+            id = self.ids[text] = len(self.names)
+            self.names.append(sys.intern(text.decode('utf-8')))
+
+        self.types.append(type)
+        self.lexemes.append(id)
+        self.lines.append(line)
+
+    def token(self, i):
+        if (literal := self.literals.get(i)) is None:
+            lexeme = self.names[self.lexemes[i]]
+        else:
+            lexeme = self.texts[i]
+
+        return Token(TokenType(self.types[i]), lexeme, self.lines[i], literal)
+
+    def discard(self, count):
+        for field in (self.types, self.lexemes, self.lines):
+            del field[:count]
+        self.discarded += count
+
+        self.literals = {
+            i - count: literal for i, literal in self.literals.items()
+            if i >= count
+        }
+        self.texts = {
+            i - count: text for i, text in self.texts.items() if i >= count
+        }
+
+# A TokenArray that the lexer fills in batches as the parser asks for more.
+class TokenStream(TokenArray):
+    BATCH = 256
+
+    def __init__(self, scanner):
+        super().__init__()
+        self.scanner = scanner
+
+    def fill(self):
+        wanted = len(self.types) + self.BATCH
+        for _ in self.scanner:
+            if len(self.types) >= wanted:
+                break
 
 class Lexer:
     def __init__(self, source):
@@ -79,18 +147,25 @@ class Lexer:
 
         self.source = source
 
-    def tokens(self):
+    def scan(self):
         if self._tokens is None:
-            self._tokens = []
-            while not self._at_end():
-                self._start = self._current
-                self._scan_token()
-            self._tokens.append(
-                Token(TokenType.EOF, self.source, -1, -1, self._line, None)
-            )
+            self._tokens = TokenArray()
+            for _ in self._scan():
+                pass
+
+        return self._tokens
+
+    def stream(self):
+        self._tokens = TokenStream(self._scan())
+        return self._tokens
 
-        for token in self._tokens:
-            yield token
+    def _scan(self):
+        while not self._at_end():
+            self._start = self._current
+            self._scan_token()
+            yield
+
+        self._tokens.add(TokenType.EOF, b'', self._line)
 
     def _at_end(self):
         return self._current >= len(self.source)
@@ -101,10 +176,8 @@ class Lexer:
         return ch
 
     def _add_token(self, type, literal=None):
-        self._tokens.append(
-            Token(type, self.source, self._start, self._current - self._start
-                , self._line, literal
-            )
+        self._tokens.add(
+            type, self.source[self._start : self._current], self._line, literal
         )
 
     def _match(self, expected):
@@ -239,3 +312,63 @@ class Lexer:
                     self._identifier()
                 else:
                     error(self._line, f'Unexpected character: "{chr(ch)}"')
+
+class RegexLexer(Lexer):
+    (WHITESPACE, IDENTIFIER, NUMBER, FRACTION, COMMENT, STRING
+        , UNTERMINATED, OPERATOR, UNEXPECTED) = range(1, 10)
+
+    PATTERN = re.compile(rb'''
+          ([ \t\r\n]+)
+        | ([A-Za-z_][A-Za-z0-9_]*)
+        | ([0-9]+(\.[0-9]+)?)
+        | (//[^\n]*)
+        | ("[^"]*")
+        | (")
+        | (!=|==|<=|>=|[(){},.\-+;/*!=<>])
+        | (.)
+    ''', re.VERBOSE | re.DOTALL)
+
+    OPERATORS = {
+        b'(': TokenType.LEFT_PAREN, b')': TokenType.RIGHT_PAREN,
+        b'{': TokenType.LEFT_BRACE, b'}': TokenType.RIGHT_BRACE,
+        b',': TokenType.COMMA, b'.': TokenType.DOT, b'-': TokenType.MINUS,
+        b'+': TokenType.PLUS, b';': TokenType.SEMICOLON,
+        b'/': TokenType.SLASH, b'*': TokenType.STAR,
+        b'!': TokenType.BANG, b'!=': TokenType.BANG_EQUAL,
+        b'=': TokenType.EQUAL, b'==': TokenType.EQUAL_EQUAL,
+        b'>': TokenType.GREATER, b'>=': TokenType.GREATER_EQUAL,
+        b'<': TokenType.LESS, b'<=': TokenType.LESS_EQUAL,
+    }
+
+    def _scan(self):
+        source = self.source
+        tokens = self._tokens
+        add = tokens.add
+        operators = self.OPERATORS
+        line = 1
+
+        for m in self.PATTERN.finditer(source):
+            kind = m.lastindex
+            start, end = m.span()
+            text = m.group()
+
+            if kind == self.WHITESPACE:
+                line += text.count(b'\n')
+            elif kind == self.IDENTIFIER:
+                add(keywords.get(text) or TokenType.IDENTIFIER, text, line)
+            elif kind == self.OPERATOR:
+                add(operators[text], text, line)
+            elif kind == self.NUMBER:
+                if m.group(self.FRACTION) is None and source[end:end + 1] == b'.':
+                    error(line, 'Invalid number with trailing dot')
+                add(TokenType.NUMBER, text, line, float(text))
+            elif kind == self.STRING:
+                line += text.count(b'\n')
+                add(TokenType.STRING, text, line, text[1:-1].decode('utf-8'))
+            elif kind == self.UNTERMINATED:
+                error(line + source[start:].count(b'\n'), 'Unterminated string')
+            elif kind == self.UNEXPECTED:
+                error(line, f'Unexpected character: "{chr(source[start])}"')
+            yield
+
+        tokens.add(TokenType.EOF, b'', line)
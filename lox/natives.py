@@ -0,0 +1,445 @@
+import functools
+import inspect
+import math
+import operator
+import re
+import sys
+
+from array import array
+from itertools import repeat
+from time import monotonic
+
+from .callable import Callable
+from .error import error
+from .rope import STRINGS, flatten
+
+# Raised by natives for bad arguments. The caller reports it at the line of
+# the call.
+class NativeError(Exception):
+    pass
+
+class NativeFunction(Callable):
+    __slots__ = ('name', 'fn', 'arity_')
+
+    def __init__(self, name, fn, arity):
+        self.name = name
+        self.fn = fn
+        self.arity_ = arity
+
+    def __str__(self):
+        return f'<native fun {self.name}>'
+
+    def arity(self):
+        return self.arity_
+
+    def call(self, interpreter, arguments):
+        return self.fn(interpreter, *arguments)
+
+def call_native(fn, interpreter, arguments, line):
+    try:
+        return fn.call(interpreter, arguments)
+    except NativeError as e:
+        error(line, str(e))
+
+def invoke_native(obj, method, interpreter, arguments, line):
+    # Calls a method of a native object, found by its find method, without
+    # binding it first.
+    fn, arity = method
+    if len(arguments) != arity:
+        error(line, f'Expected {arity} arguments, got {len(arguments)}')
+
+    try:
+        return fn(obj, interpreter, *arguments)
+    except NativeError as e:
+        error(line, str(e))
+
+# Every engine defines these as globals.
+NATIVES = {}
+
+def native(fn=None, *, name=None):
+    # Registers a Python function as a Lox global. It is passed the
+    # interpreter and then the Lox arguments, whose count is its arity.
+    if fn is None:
+        return lambda fn: native(fn, name=name)
+
+    name = name or fn.__name__
+    arity = len(inspect.signature(fn).parameters) - 1
+    NATIVES[name] = NativeFunction(name, fn, arity)
+    return fn
+
+# Objects of the native classes below. Their Lox methods are looked up by
+# name, bound to the object and called like any other native.
+class NativeObject:
+    __slots__ = ()
+    # Lox name to (function, arity), set by native_class.
+    methods = {}
+
+    def __str__(self):
+        return f'{type(self).__name__} instance'
+
+    def find(self, name):
+        if (method := self.methods.get(name.lexeme)) is None:
+            error(name.line, f"Undefined property '{name.lexeme}'")
+        return method
+
+    def get(self, name):
+        fn, arity = self.find(name)
+        return NativeFunction(name.lexeme, fn.__get__(self), arity)
+
+def native_class(cls):
+    # Registers the class as a Lox global that constructs its objects. Its
+    # lox_ methods, taking the interpreter and then the Lox arguments, are
+    # the methods of the objects.
+    cls.methods = {
+        name.removeprefix('lox_'):
+            (fn, len(inspect.signature(fn).parameters) - 2)
+        for name in dir(cls) if name.startswith('lox_')
+        for fn in [getattr(cls, name)]
+    }
+
+    arity = len(inspect.signature(cls.__init__).parameters) - 1
+    NATIVES[cls.__name__] = NativeFunction(
+        cls.__name__, lambda interpreter, *arguments: cls(*arguments), arity
+    )
+    return cls
+
+# How Lox prints a value.
+def stringify(x):
+    if x is None:
+        return 'nil'
+
+    s = str(x)
+
+    if 'True' == s:
+        return 'true'
+
+    if 'False' == s:
+        return 'false'
+
+    if isinstance(x, float) and s.endswith('.0'):
+        return s[:-2]
+
+    return s
+
+def number(value):
+    if not isinstance(value, float):
+        raise NativeError(f'Operand must be a number: {stringify(value)}')
+    return value
+
+def integer(value):
+    if not number(value).is_integer():
+        raise NativeError(f'Operand must be an integer: {stringify(value)}')
+    return int(value)
+
+def count(value):
+    if (n := integer(value)) < 0:
+        raise NativeError(f'Size must not be negative: {stringify(value)}')
+    return n
+
+def zeros(size, make):
+    # make(n) gives n zeros, or fails if there isn't room for them.
+    try:
+        return make(count(size))
+    except (OverflowError, MemoryError, ValueError):
+        raise NativeError(f'Size too large: {stringify(size)}') from None
+
+def zero_array(n):
+    return array('d', bytes(8 * n))
+
+def text(value):
+    # A string or Rope as it is, for natives that don't need its characters.
+    if not isinstance(value, STRINGS):
+        raise NativeError(f'Operand must be a string: {stringify(value)}')
+    return value
+
+def string(value):
+    return flatten(text(value))
+
+@native
+def clock(interpreter):
+    return monotonic()
+
+@native
+def sqrt(interpreter, x):
+    if number(x) < 0.0:
+        raise NativeError(f'Operand must not be negative: {stringify(x)}')
+    return math.sqrt(x)
+
+@native
+def floor(interpreter, x):
+    if math.isinf(number(x)) or math.isnan(x):
+        return x
+    return float(math.floor(x))
+
+@native(name='len')
+def len_(interpreter, s):
+    return float(len(text(s)))
+
+@native
+def substr(interpreter, s, start, length):
+    s, start, length = string(s), integer(start), integer(length)
+    if not (0 <= start <= len(s) and 0 <= length <= len(s) - start):
+        raise NativeError(f'Substring out of range: {start}, {length}')
+    return s[start:start + length]
+
+@native(name='str')
+def str_(interpreter, value):
+    return stringify(value)
+
+# A number as Lox writes it, with an optional sign.
+NUMBER = re.compile(r'-?[0-9]+(\.[0-9]+)?')
+
+@native
+def num(interpreter, s):
+    if NUMBER.fullmatch(s := string(s)) is None:
+        raise NativeError(f'Operand must be a number string: {s}')
+    return float(s)
+
+@native
+def readLine(interpreter):
+    # nil at the end of input.
+    try:
+        line = sys.stdin.readline()
+    except UnicodeDecodeError as e:
+        raise NativeError(f'Cannot read a line: {e.reason}') from None
+    if not line:
+        return None
+    return line.removesuffix('\n')
+
+@native
+def writeFile(interpreter, path, contents):
+    try:
+        with open(string(path), 'w') as out:
+            out.write(string(contents))
+    except OSError as e:
+        raise NativeError(f'Cannot write {path}: {e.strerror}') from None
+    except ValueError as e:
+        # Such as a path with a NUL in it, or text the encoding can't write.
+        raise NativeError(f'Cannot write {path}: {e}') from None
+
+@native_class
+class List(NativeObject):
+    __slots__ = ('items',)
+
+    def __init__(self):
+        self.items = []
+
+    def index(self, i):
+        if not 0 <= (i := integer(i)) < len(self.items):
+            raise NativeError(f'Index out of range: {i}')
+        return i
+
+    def lox_get(self, interpreter, i):
+        return self.items[self.index(i)]
+
+    def lox_set(self, interpreter, i, value):
+        self.items[self.index(i)] = value
+        return value
+
+    def lox_push(self, interpreter, value):
+        self.items.append(value)
+
+    def lox_pop(self, interpreter):
+        if not self.items:
+            raise NativeError(f'Pop from empty {type(self).__name__}')
+        return self.items.pop()
+
+    def lox_len(self, interpreter):
+        return float(len(self.items))
+
+# A List of numbers only, stored unboxed.
+@native_class
+class Array(List):
+    __slots__ = ()
+
+    def __init__(self, size):
+        self.items = zeros(size, zero_array)
+
+    def lox_set(self, interpreter, i, value):
+        self.items[self.index(i)] = number(value)
+        return value
+
+    def lox_push(self, interpreter, value):
+        self.items.append(number(value))
+
+@native_class
+class Map(NativeObject):
+    __slots__ = ('items',)
+
+    def __init__(self):
+        self.items = {}
+
+    def lox_get(self, interpreter, key):
+        # nil for a missing key.
+        return self.items.get(key)
+
+    def lox_set(self, interpreter, key, value):
+        self.items[flatten(key)] = value
+        return value
+
+    def lox_has(self, interpreter, key):
+        return key in self.items
+
+    def lox_pop(self, interpreter, key):
+        return self.items.pop(key, None)
+
+    def lox_len(self, interpreter):
+        return float(len(self.items))
+
+    def lox_keys(self, interpreter):
+        keys = List()
+        keys.items.extend(self.items)
+        return keys
+
+def divide(x, y):
+    # Element-wise division follows IEEE 754, as NumPy does, instead of
+    # failing part way through a Vec.
+    if y == 0.0:
+        if x == 0.0 or x != x:
+            return math.nan
+        return math.copysign(math.inf, x) * math.copysign(1.0, y)
+    return x / y
+
+def elementwise(fn, a, b):
+    if numpy is not None:
+        x = a.items if isinstance(a, Vec) else a
+        y = b.items if isinstance(b, Vec) else b
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            return Vec.of(numpy.asarray(fn(x, y), dtype=float))
+
+    if fn is operator.truediv:
+        fn = divide
+    x = a.items if isinstance(a, Vec) else repeat(a)
+    y = b.items if isinstance(b, Vec) else repeat(b)
+    return Vec.of(array('d', map(fn, x, y)))
+
+def arithmetic_error(operands, show=str):
+    # Why operands can't be used with an arithmetic operator, if they can't:
+    # each must be a number or a Vec, and Vecs must have the same length.
+    # The operators write a bad operand as Python does; natives pass
+    # stringify to write it as Lox does.
+    size = None
+    for operand in operands:
+        if isinstance(operand, Vec):
+            if size is not None and size != len(operand.items):
+                return f'Vec lengths differ: {size}, {len(operand.items)}'
+            size = len(operand.items)
+        elif not isinstance(operand, float):
+            return f'Operand must be a number: {show(operand)}'
+    return None
+
+# NumPy holds the items of Vecs when it is installed. It is only imported
+# once the first Vec is made, so other scripts don't wait for it.
+numpy = None
+
+@functools.cache
+def import_numpy():
+    global numpy
+    try:
+        import numpy
+    except ImportError:
+        pass
+
+# A fixed-size vector of numbers. The arithmetic and comparison operators
+# apply element-wise over whole Vecs, or a Vec and a number, in one native
+# call. Comparisons give 1 or 0 for each element. Equality is still identity.
+@native_class
+class Vec(NativeObject):
+    __slots__ = ('items',)
+
+    def __init__(self, size):
+        import_numpy()
+        self.items = zeros(size, zero_array if numpy is None else numpy.zeros)
+
+    @classmethod
+    def of(cls, items):
+        vec = cls.__new__(cls)
+        vec.items = items
+        return vec
+
+    def index(self, i):
+        if not 0 <= (i := integer(i)) < len(self.items):
+            raise NativeError(f'Index out of range: {i}')
+        return i
+
+    def lox_get(self, interpreter, i):
+        return float(self.items[self.index(i)])
+
+    def lox_set(self, interpreter, i, value):
+        self.items[self.index(i)] = number(value)
+        return value
+
+    def lox_len(self, interpreter):
+        return float(len(self.items))
+
+    def __add__(self, other):
+        return elementwise(operator.add, self, other)
+
+    def __radd__(self, other):
+        return elementwise(operator.add, other, self)
+
+    def __sub__(self, other):
+        return elementwise(operator.sub, self, other)
+
+    def __rsub__(self, other):
+        return elementwise(operator.sub, other, self)
+
+    def __mul__(self, other):
+        return elementwise(operator.mul, self, other)
+
+    def __rmul__(self, other):
+        return elementwise(operator.mul, other, self)
+
+    def __truediv__(self, other):
+        return elementwise(operator.truediv, self, other)
+
+    def __rtruediv__(self, other):
+        return elementwise(operator.truediv, other, self)
+
+    def __neg__(self):
+        return elementwise(operator.mul, self, -1.0)
+
+    def __lt__(self, other):
+        return elementwise(operator.lt, self, other)
+
+    def __le__(self, other):
+        return elementwise(operator.le, self, other)
+
+    def __gt__(self, other):
+        return elementwise(operator.gt, self, other)
+
+    def __ge__(self, other):
+        return elementwise(operator.ge, self, other)
+
+def vector(value):
+    if not isinstance(value, Vec):
+        raise NativeError(f'Operand must be a Vec: {stringify(value)}')
+    return value.items
+
+def nonempty(value):
+    if not len(items := vector(value)):
+        raise NativeError('Vec is empty')
+    return items
+
+@native(name='sum')
+def sum_(interpreter, v):
+    items = vector(v)
+    return float(items.sum() if numpy is not None else sum(items))
+
+@native(name='min')
+def min_(interpreter, v):
+    items = nonempty(v)
+    return float(items.min() if numpy is not None else min(items))
+
+@native(name='max')
+def max_(interpreter, v):
+    items = nonempty(v)
+    return float(items.max() if numpy is not None else max(items))
+
+@native
+def dot(interpreter, a, b):
+    if (message := arithmetic_error((a, b), stringify)) is not None:
+        raise NativeError(message)
+    if numpy is not None:
+        return float(numpy.dot(vector(a), vector(b)))
+    return float(sum(map(operator.mul, vector(a), vector(b))))
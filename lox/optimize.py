@@ -0,0 +1,196 @@
+import operator
+
+from .ast import expr, stmt
+from .lex import TokenType
+
+ARITHMETIC = {
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.MINUS: operator.sub,
+    TokenType.PLUS: operator.add,
+    TokenType.SLASH: operator.truediv,
+    TokenType.STAR: operator.mul,
+}
+
+# Returned when an operation would fail at run time. It is left in the tree
+# so that the error is still reported, at its own line, if it is reached.
+UNFOLDED = object()
+
+def is_truthy(value):
+    return value is not None and value is not False
+
+def is_equal(a, b):
+    return b is None if a is None else a == b
+
+def fold_binary(op, a, b):
+    match op:
+        case TokenType.EQUAL_EQUAL:
+            return is_equal(a, b)
+        case TokenType.BANG_EQUAL:
+            return not is_equal(a, b)
+
+    if isinstance(a, float) and isinstance(b, float):
+        if TokenType.SLASH == op and b == 0.0:
+            return UNFOLDED
+        return ARITHMETIC[op](a, b)
+
+    if TokenType.PLUS == op and isinstance(a, str) and isinstance(b, str):
+        return a + b
+
+    return UNFOLDED
+
+def fold_unary(op, value):
+    if TokenType.BANG == op:
+        return not is_truthy(value)
+
+    if isinstance(value, float):
+        return -value
+
+    return UNFOLDED
+
+# Runs after the Resolver: folds constant subexpressions into Literals, drops
+# Groupings and removes statements that can never run or have no effect.
+class Optimizer(expr.Visitor, stmt.Visitor):
+    def optimize(self, statements):
+        return [
+            s for statement in statements
+            if (s := self.optimize_stmt(statement)) is not None
+        ]
+
+    def optimize_stmt(self, s):
+        return s.accept(self)
+
+    def optimize_expr(self, e):
+        return e.accept(self)
+
+    def branch(self, s):
+        # Where a statement is required, one that went away becomes empty.
+        if (s := self.optimize_stmt(s)) is None:
+            return stmt.Block([])
+
+        return s
+
+    def visit_assign_expr(self, e):
+        e.value = self.optimize_expr(e.value)
+        return e
+
+    def visit_binary_expr(self, e):
+        e.left = left = self.optimize_expr(e.left)
+        e.right = right = self.optimize_expr(e.right)
+
+        if type(left) is expr.Literal and type(right) is expr.Literal:
+            value = fold_binary(e.operator.type, left.value, right.value)
+            if value is not UNFOLDED:
+                return expr.Literal(value)
+
+        return e
+
+    def visit_call_expr(self, e):
+        e.callee = self.optimize_expr(e.callee)
+        e.arguments = [self.optimize_expr(arg) for arg in e.arguments]
+        return e
+
+    def visit_get_expr(self, e):
+        e.object = self.optimize_expr(e.object)
+        return e
+
+    def visit_grouping_expr(self, e):
+        return self.optimize_expr(e.expression)
+
+    def visit_literal_expr(self, e):
+        return e
+
+    def visit_logical_expr(self, e):
+        e.left = left = self.optimize_expr(e.left)
+        e.right = right = self.optimize_expr(e.right)
+
+        if type(left) is expr.Literal:
+            # Short-circuits on the left operand or yields the right one.
+            if is_truthy(left.value) == (TokenType.OR == e.operator.type):
+                return left
+            return right
+
+        return e
+
+    def visit_set_expr(self, e):
+        e.object = self.optimize_expr(e.object)
+        e.value = self.optimize_expr(e.value)
+        return e
+
+    def visit_super_expr(self, e):
+        return e
+
+    def visit_this_expr(self, e):
+        return e
+
+    def visit_unary_expr(self, e):
+        e.right = right = self.optimize_expr(e.right)
+
+        if type(right) is expr.Literal:
+            value = fold_unary(e.operator.type, right.value)
+            if value is not UNFOLDED:
+                return expr.Literal(value)
+
+        return e
+
+    def visit_variable_expr(self, e):
+        return e
+
+    def visit_block_stmt(self, s):
+        s.statements = self.optimize(s.statements)
+        return s
+
+    def visit_class_stmt(self, s):
+        for method in s.methods:
+            self.optimize_stmt(method)
+        return s
+
+    def visit_expression_stmt(self, s):
+        s.expression = self.optimize_expr(s.expression)
+        if type(s.expression) is expr.Literal:
+            return None
+        return s
+
+    def visit_function_stmt(self, s):
+        s.body = self.optimize(s.body)
+        return s
+
+    def visit_if_stmt(self, s):
+        s.condition = condition = self.optimize_expr(s.condition)
+
+        if type(condition) is expr.Literal:
+            if is_truthy(condition.value):
+                return self.optimize_stmt(s.then_branch)
+            if s.else_branch is not None:
+                return self.optimize_stmt(s.else_branch)
+            return None
+
+        s.then_branch = self.branch(s.then_branch)
+        if s.else_branch is not None:
+            s.else_branch = self.branch(s.else_branch)
+        return s
+
+    def visit_print_stmt(self, s):
+        s.expression = self.optimize_expr(s.expression)
+        return s
+
+    def visit_return_stmt(self, s):
+        if s.value is not None:
+            s.value = self.optimize_expr(s.value)
+        return s
+
+    def visit_var_stmt(self, s):
+        if s.initializer is not None:
+            s.initializer = self.optimize_expr(s.initializer)
+        return s
+
+    def visit_while_stmt(self, s):
+        s.condition = condition = self.optimize_expr(s.condition)
+
+        if type(condition) is expr.Literal and not is_truthy(condition.value):
+            return None
+
+        s.body = self.branch(s.body)
+        return s
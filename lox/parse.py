@@ -1,47 +1,42 @@
 from .ast import expr, stmt
 from .error import error
-from .lex import Token, TokenType
+from .lex import TokenType
 
 class Parser:
     MAX_ARGUMENTS = 255
     def __init__(self, tokens):
         self.tokens = tokens
+        self.types = tokens.types
         self.current = 0
 
     def parse(self):
-        statements = []
-        _s = statements.append
-        while not self.is_at_end():
-            _s(self.declaration())
+        return list(self.declarations())
 
-        return statements
+    def declarations(self):
+        while not self.is_at_end():
+            yield self.declaration()
 
     def previous(self):
-        return self.tokens[self.current - 1]
+        return self.tokens.token(self.current - 1)
 
     def peek(self):
-        return self.tokens[self.current]
+        return self.tokens.token(self.current)
 
     def is_at_end(self):
-        return self.peek().type == TokenType.EOF
+        return self.types[self.current] == TokenType.EOF
 
     def check(self, type):
-        if self.is_at_end():
-            return False
-
-        return self.peek().type == type
+        # EOF is never asked for, so it never matches.
+        return self.types[self.current] == type
 
     def advance(self):
         if not self.is_at_end():
             self.current += 1
 
-        return self.previous()
-
     def match(self, *types):
-        for t in types:
-            if self.check(t):
-                self.advance()
-                return True
+        if self.types[self.current] in types:
+            self.current += 1
+            return True
 
         return False
 
@@ -193,39 +188,23 @@ class Parser:
 
     def consume(self, type, message):
         if self.check(type):
-            return self.advance()
+            self.current += 1
+            return self.previous()
 
         self.error(self.peek(), message)
 
-    def synchronize(self):
-        self.advance()
-        while not self.is_at_end():
-            if self.previous().type == TokenType.SEMICOLON:
-                return
-
-            if self.peek().type in (
-                TokenType.CLASS, TokenType.FOR, TokenType.FUN, TokenType.IF,
-                TokenType.PRINT, TokenType.RETURN, TokenType.VAR, TokenType.WHILE
-            ):
-                return
-
-            self.advance()
-
     def error(self, token, message):
         error(token.line, message
             , ' at end' if token.type == TokenType.EOF else f" '{token.lexeme}'")
 
     def declaration(self):
-        try:
-            if self.match(TokenType.CLASS):
-                return self.class_declaration()
-            if self.match(TokenType.FUN):
-                return self.function('function')
-            if self.match(TokenType.VAR):
-                return self.var_declaration()
-            return self.statement()
-        except ParseError:
-            self.synchronize()
+        if self.match(TokenType.CLASS):
+            return self.class_declaration()
+        if self.match(TokenType.FUN):
+            return self.function('function')
+        if self.match(TokenType.VAR):
+            return self.var_declaration()
+        return self.statement()
 
     def class_declaration(self):
         name = self.consume(TokenType.IDENTIFIER, "Expect class name")
@@ -378,3 +357,38 @@ class Parser:
         self.consume(TokenType.RIGHT_BRACE, "Expect '}' after block")
 
         return statements
+
+# Parses from a TokenStream, keeping only the tokens of the declaration that
+# is being parsed.
+class StreamingParser(Parser):
+    def __init__(self, tokens):
+        super().__init__(tokens)
+        tokens.fill()
+
+    def declarations(self):
+        for declaration in super().declarations():
+            yield declaration
+
+            # Nothing before the previous token is ever looked at again.
+            self.tokens.discard(self.current - 1)
+            self.current = 1
+
+    def advance(self):
+        super().advance()
+        if self.current == len(self.types):
+            self.tokens.fill()
+
+    def match(self, *types):
+        if super().match(*types):
+            if self.current == len(self.types):
+                self.tokens.fill()
+            return True
+
+        return False
+
+    def consume(self, type, message):
+        token = super().consume(type, message)
+        if self.current == len(self.types):
+            self.tokens.fill()
+
+        return token
@@ -0,0 +1,86 @@
+import collections
+import signal
+import time
+
+from .classes import Class
+from .closure import CompiledFunction
+from .function import Function
+from .vm import VM
+
+ROOT = '<script>'
+
+def vm_frame(frame):
+    # The script itself also runs in a VM.run frame, with no callee in slot 0.
+    if frame.f_locals['stack'][0] is None:
+        return None
+
+    return frame.f_locals['closure'].proto.qualname
+
+# Python frames that mark entry to a Lox function or class, for each engine,
+# and how to name them. Methods are named Class.method, so that methods of
+# the same name in different classes are told apart.
+FRAMES = {
+    Function.run.__code__: lambda frame: frame.f_locals['self'].qualname,
+    CompiledFunction.run.__code__:
+        lambda frame: frame.f_locals['self'].qualname,
+    VM.run.__code__: vm_frame,
+    Class.call.__code__: lambda frame: frame.f_locals['self'].name,
+}
+
+# Samples the Lox call stack on a CPU-time timer. The stack is recovered from
+# the Python frames running Lox calls, so nothing is added to the calls
+# themselves.
+class Profiler:
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self.cpu_time = 0.0
+
+    def start(self):
+        self.cpu_time -= time.process_time()
+        signal.signal(signal.SIGPROF, self.sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+        self.cpu_time += time.process_time()
+
+    def sample(self, signum, frame):
+        stack = []
+        while frame is not None:
+            if (label := FRAMES.get(frame.f_code)) is not None:
+                if (name := label(frame)) is not None:
+                    stack.append(name)
+            frame = frame.f_back
+
+        stack.append(ROOT)
+        self.stacks[tuple(reversed(stack))] += 1
+
+    def write_collapsed(self, out):
+        # One 'root;caller;callee count' line per stack, as flame graph tools
+        # expect.
+        for stack, count in sorted(self.stacks.items()):
+            print(';'.join(stack), count, file=out)
+
+    def write_summary(self, out, top=20):
+        total = sum(self.stacks.values())
+        if 0 == total:
+            print('No samples collected', file=out)
+            return
+
+        inclusive = collections.Counter()
+        exclusive = collections.Counter()
+        for stack, count in self.stacks.items():
+            exclusive[stack[-1]] += count
+            for name in set(stack):
+                inclusive[name] += count
+
+        # The timer only fires on clock ticks, which may be further apart than
+        # the interval asked for.
+        print(f'{total} samples over {self.cpu_time:.3f}s of CPU time'
+            , file=out)
+        print(f'{"self":>7}{"total":>8}  function', file=out)
+        for name, count in exclusive.most_common(top):
+            print(f'{count / total:>7.1%}{inclusive[name] / total:>8.1%}  {name}'
+                , file=out)
@@ -7,8 +7,7 @@ FunctionType = enum.Enum('FunctionType', 'NONE FUNCTION INITIALIZER METHOD')
 ClassType = enum.Enum('ClassType', 'NONE CLASS SUBCLASS')
 
 class Resolver(expr.Visitor, stmt.Visitor):
-    def __init__(self, interpreter):
-        self.interpreter = interpreter
+    def __init__(self):
         self.scopes = []
         self.current_function = FunctionType.NONE
         self.current_class = ClassType.NONE
@@ -50,10 +49,10 @@ class Resolver(expr.Visitor, stmt.Visitor):
             self.current_class = ClassType.SUBCLASS
             self.resolve_stmt(s.superclass)
             self.begin_scope()
-            self.scopes[-1]['super'] = True
+            self.scopes[-1]['super'] = 0
 
         self.begin_scope()
-        self.scopes[-1]['this'] = True
+        self.scopes[-1]['this'] = 0
 
         for method in s.methods:
             decl = FunctionType.METHOD
@@ -84,16 +83,19 @@ class Resolver(expr.Visitor, stmt.Visitor):
                 name, f"Already a variable '{name.lexeme}' in this scope"
             )
 
-        scope[name.lexeme] = False
+        scope[name.lexeme] = None
 
     def define(self, name):
         if not self.scopes:
             return
 
-        self.scopes[-1][name.lexeme] = True
+        # Declarations are always immediately followed by their definition,
+        # so the name's slot is its position in the scope.
+        scope = self.scopes[-1]
+        scope[name.lexeme] = len(scope) - 1
 
     def visit_variable_expr(self, e):
-        if self.scopes and (self.scopes[-1].get(e.name.lexeme) is False):
+        if self.scopes and (self.scopes[-1].get(e.name.lexeme, 0) is None):
             self.error(e.name
                 , "Can't read local variable in its own initializer")
 
@@ -102,7 +104,8 @@ class Resolver(expr.Visitor, stmt.Visitor):
     def resolve_local(self, e, name):
         for distance, scope in enumerate(reversed(self.scopes)):
             if name.lexeme in scope:
-                self.interpreter.resolve(e, distance)
+                e.depth = distance
+                e.slot = scope[name.lexeme]
                 return
 
     def visit_assign_expr(self, e):
@@ -0,0 +1,59 @@
+# Concatenations shorter than this are done eagerly.
+MIN_LENGTH = 256
+
+def concat(a, b):
+    # Joins two strings or Ropes. Appending to a Rope doesn't copy the
+    # string it holds, so building a string piece by piece is linear.
+    if type(a) is Rope:
+        return a.append(b)
+
+    if len(a) + len(b) < MIN_LENGTH:
+        return a + str(b)
+
+    return Rope([a], 1, len(a)).append(b)
+
+def flatten(value):
+    if type(value) is Rope:
+        return str(value)
+    return value
+
+# A string made by concatenation, kept as a list of pieces until something
+# needs its text. Ropes made by appending to the same Rope share the list:
+# each one only covers its first count pieces, and only the Rope covering
+# the whole list appends to it in place.
+class Rope:
+    __slots__ = ('parts', 'count', 'length', 'text')
+
+    def __init__(self, parts, count, length):
+        self.parts = parts
+        self.count = count
+        self.length = length
+        self.text = None
+
+    def append(self, s):
+        s = str(s)
+        parts = self.parts
+        if len(parts) != self.count:
+            parts = parts[:self.count]
+
+        parts.append(s)
+        return Rope(parts, self.count + 1, self.length + len(s))
+
+    def __str__(self):
+        if self.text is None:
+            self.text = ''.join(self.parts[:self.count])
+        return self.text
+
+    def __len__(self):
+        return self.length
+
+    def __eq__(self, other):
+        if isinstance(other, STRINGS):
+            return str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+# The types of Lox strings.
+STRINGS = (str, Rope)
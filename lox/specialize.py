@@ -0,0 +1,94 @@
+from .ast import expr, fused
+from .environment import Globals
+from .lex import TokenType
+from .optimize import ARITHMETIC, Optimizer
+
+COMPARISONS = {
+    op: ARITHMETIC[op] for op in (
+        TokenType.GREATER, TokenType.GREATER_EQUAL
+        , TokenType.LESS, TokenType.LESS_EQUAL
+    )
+}
+
+def is_local(e):
+    return type(e) is expr.Variable and e.depth is not None
+
+# Rewrites common patterns in resolved trees into fused nodes for the
+# Interpreter. Each one falls back to the generic node it replaced when its
+# operands aren't of the expected type.
+class Specializer(Optimizer, fused.Visitor):
+    def visit_assign_expr(self, e):
+        e = super().visit_assign_expr(e)
+        match e.value:
+            case expr.Binary(
+                expr.Variable() as variable, op, expr.Literal(float(delta))
+            ) if (
+                op.type in (TokenType.PLUS, TokenType.MINUS)
+                and is_local(variable)
+                and (variable.depth, variable.slot) == (e.depth, e.slot)
+            ):
+                if TokenType.MINUS == op.type:
+                    delta = -delta
+                return fused.IncrementLocal(e, e.depth, e.slot, delta)
+
+        return e
+
+    def visit_binary_expr(self, e):
+        e = super().visit_binary_expr(e)
+        match e:
+            case expr.Binary(left, op, right) if (
+                op.type in COMPARISONS and is_local(left)
+            ):
+                compare = COMPARISONS[op.type]
+                match right:
+                    case expr.Literal(float(constant)):
+                        return fused.CompareLocalConst(
+                            e, left.depth, left.slot, compare, constant
+                        )
+                    case expr.Variable():
+                        return fused.CompareLocal(
+                            e, left.depth, left.slot, compare, right
+                        )
+
+        return e
+
+    def visit_call_expr(self, e):
+        if type(e.callee) is expr.Get:
+            # Keep the method call site intact for its inline cache.
+            e.callee.object = self.optimize_expr(e.callee.object)
+            e.arguments = [self.optimize_expr(arg) for arg in e.arguments]
+            return e
+
+        e = super().visit_call_expr(e)
+        if type(e.callee) is expr.Variable and e.callee.depth is None:
+            return fused.CallGlobal(
+                e, Globals.slot(e.callee.name.lexeme), e.arguments
+            )
+
+        return e
+
+    def visit_get_expr(self, e):
+        e = super().visit_get_expr(e)
+        match e.object:
+            case fused.GetPath(root, gets):
+                return fused.GetPath(root, [*gets, e])
+            case expr.Get(root):
+                return fused.GetPath(root, [e.object, e])
+
+        return e
+
+    # A tree that is run again has already been specialized.
+    def visit_call_global_fused(self, f):
+        return f
+
+    def visit_compare_local_fused(self, f):
+        return f
+
+    def visit_compare_local_const_fused(self, f):
+        return f
+
+    def visit_get_path_fused(self, f):
+        return f
+
+    def visit_increment_local_fused(self, f):
+        return f
@@ -0,0 +1,115 @@
+import collections
+import contextlib
+import functools
+import json
+import time
+
+from .ast import expr, stmt
+from .closure import CompiledFunction
+from .environment import Environment
+from .function import Function
+from .instance import Instance
+from .returnable import Return
+from .vm import VM
+
+# What each counter counts: calls to these methods while a Stats is counting.
+# The VM runs the script itself in a frame with no callee in slot 0.
+COUNTED = {
+    'environments': [(Environment, '__init__')],
+    'calls': [
+        (Function, 'run'), (CompiledFunction, 'run')
+        , (VM, 'run', lambda vm, closure, stack: stack[0] is not None)
+    ],
+    'binds': [(Function, 'bind'), (CompiledFunction, 'bind')],
+    'instances': [(Instance, '__init__')],
+    'returns': [(Return, '__init__')],
+}
+
+# Counters for events that an engine doesn't have, or that aren't comparable
+# with the other engines'. The VM keeps locals on its stack instead of in
+# Environments, binds every method it calls and returns without a Return.
+UNCOUNTED = {VM: ('environments', 'binds', 'returns')}
+
+def measure(stats, phase):
+    if stats is None:
+        return contextlib.nullcontext()
+
+    return stats.phase(phase)
+
+class Stats:
+    def __init__(self):
+        self.phases = collections.Counter()
+        self.tokens = 0
+        self.nodes = collections.Counter()
+        self.counters = collections.Counter({name: 0 for name in COUNTED})
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += time.perf_counter() - start
+
+    @contextlib.contextmanager
+    def counting(self, engine):
+        for name in UNCOUNTED.get(type(engine), ()):
+            self.counters[name] = None
+
+        # The methods are only wrapped for as long as this lasts, so there is
+        # no cost when not counting.
+        originals = []
+        for name, targets in COUNTED.items():
+            for cls, method, *predicate in targets:
+                original = cls.__dict__[method]
+                originals.append((cls, method, original))
+                setattr(cls, method, self.counter(name, original, *predicate))
+        try:
+            yield
+        finally:
+            for cls, method, original in originals:
+                setattr(cls, method, original)
+
+    def counter(self, name, method, predicate=None):
+        counters = self.counters
+
+        @functools.wraps(method)
+        def counted(*args):
+            if counters[name] is not None and (
+                predicate is None or predicate(*args)
+            ):
+                counters[name] += 1
+            return method(*args)
+        return counted
+
+    def count_nodes(self, statements):
+        pending = list(statements)
+        while pending:
+            node = pending.pop()
+            if isinstance(node, list):
+                pending.extend(node)
+            elif isinstance(node, (expr.Expr, stmt.Stmt)):
+                self.nodes[type(node).__name__] += 1
+                pending.extend(getattr(node, field) for field in node.__match_args__)
+
+    def as_dict(self):
+        return dict(
+            phases=dict(self.phases), tokens=self.tokens
+            , nodes=dict(sorted(self.nodes.items())), **self.counters
+        )
+
+    def write(self, out, format='text'):
+        if 'json' == format:
+            json.dump(self.as_dict(), out, indent=2)
+            print(file=out)
+            return
+
+        for name, seconds in self.phases.items():
+            print(f'{name + " time":<20}{seconds * 1000:>12.3f}ms', file=out)
+        print(f'{"tokens":<20}{self.tokens:>14}', file=out)
+        print(f'{"nodes":<20}{self.nodes.total():>14}', file=out)
+        for name, count in sorted(self.nodes.items()):
+            print(f'  {name:<18}{count:>14}', file=out)
+        for name, count in self.counters.items():
+            print(f'{name:<20}{"n/a" if count is None else count:>14}'
+                , file=out)
@@ -0,0 +1,312 @@
+from .callable import Callable
+from .classes import Class
+from .compile import (
+    CONSTANT, NIL, TRUE, FALSE, POP, GET_LOCAL, SET_LOCAL, GET_UPVALUE
+    , SET_UPVALUE, GET_GLOBAL, SET_GLOBAL, DEFINE_GLOBAL, GET_PROPERTY
+    , CHECK_FIELDS, SET_PROPERTY, GET_SUPER, EQUAL, NOT_EQUAL, GREATER
+    , GREATER_EQUAL, LESS, LESS_EQUAL, ADD, SUBTRACT, MULTIPLY, DIVIDE, NOT
+    , NEGATE, PRINT, JUMP, JUMP_IF_FALSE, CALL, CLOSURE, CLOSE_UPVALUE, RETURN
+    , INHERIT, CLASS, Compiler
+)
+from .error import error
+from .instance import Instance
+from .natives import (
+    NATIVES, NativeFunction, NativeObject, Vec, arithmetic_error, call_native
+    , stringify
+)
+from .rope import STRINGS, concat
+
+class Upvalue:
+    __slots__ = ('cells', 'index')
+
+    def __init__(self, cells, index):
+        self.cells = cells
+        self.index = index
+
+    def close(self):
+        self.cells = [self.cells[self.index]]
+        self.index = 0
+
+class Closure(Callable):
+    def __init__(self, proto, upvalues):
+        self.proto = proto
+        self.upvalues = upvalues
+
+    def __str__(self):
+        return f'<fun {self.proto.name}>'
+
+    def arity(self):
+        return self.proto.arity
+
+    def call(self, interpreter, arguments):
+        return interpreter.run(self, [self, *arguments])
+
+    def call_method(self, interpreter, instance, arguments):
+        return interpreter.run(self, [instance, *arguments])
+
+    def bind(self, instance):
+        return BoundMethod(instance, self)
+
+class BoundMethod(Callable):
+    def __init__(self, receiver, method):
+        self.receiver = receiver
+        self.method = method
+
+    def __str__(self):
+        return str(self.method)
+
+    def arity(self):
+        return self.method.proto.arity
+
+    def call(self, interpreter, arguments):
+        return interpreter.run(self.method, [self.receiver, *arguments])
+
+class VM:
+    stringify = staticmethod(stringify)
+
+    def __init__(self):
+        self.globals = dict(NATIVES)
+
+    def interpret(self, statements, stats=None):
+        if stats is not None:
+            with stats.phase('execute'), stats.counting(self):
+                return self.interpret(statements)
+
+        script = Compiler().compile(statements)
+        self.run(Closure(script, []), [None])
+
+    def operand_error(self, line, *operands):
+        if (message := arithmetic_error(operands)) is not None:
+            error(line, message)
+
+    def run(self, closure, stack):
+        chunk = closure.proto.chunk
+        code = chunk.code
+        constants = chunk.constants
+        lines = chunk.lines
+        upvalues = closure.upvalues
+        globals_ = self.globals
+        open_upvalues = None
+        push = stack.append
+        pop = stack.pop
+        ip = 0
+
+        while True:
+            op = code[ip]
+            ip += 1
+
+            if op == GET_LOCAL:
+                push(stack[code[ip]])
+                ip += 1
+            elif op == CONSTANT:
+                push(constants[code[ip]])
+                ip += 1
+            elif op == POP:
+                pop()
+            elif op == GET_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                try:
+                    push(globals_[name])
+                except KeyError:
+                    error(lines[ip - 1], f"Undefined variable '{name}'")
+            elif op == JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip = code[ip]
+                else:
+                    ip += 1
+            elif op == JUMP:
+                ip = code[ip]
+            elif op == LESS:
+                b = pop()
+                a = stack[-1]
+                if not (isinstance(a, float) and isinstance(b, float)):
+                    self.operand_error(lines[ip - 1], a, b)
+                stack[-1] = a < b
+            elif op == ADD:
+                b = pop()
+                a = stack[-1]
+                if isinstance(a, float) and isinstance(b, float):
+                    stack[-1] = a + b
+                elif isinstance(a, STRINGS) and isinstance(b, STRINGS):
+                    stack[-1] = concat(a, b)
+                elif isinstance(a, Vec) or isinstance(b, Vec):
+                    self.operand_error(lines[ip - 1], a, b)
+                    stack[-1] = a + b
+                else:
+                    error(lines[ip - 1]
+                        , 'Operands must be two numbers or two strings')
+            elif op == SUBTRACT:
+                b = pop()
+                a = stack[-1]
+                if not (isinstance(a, float) and isinstance(b, float)):
+                    self.operand_error(lines[ip - 1], a, b)
+                stack[-1] = a - b
+            elif op == CALL:
+                argc = code[ip]
+                ip += 1
+                frame = stack[len(stack) - argc - 1:]
+                del stack[len(stack) - argc - 1:]
+                callee = frame[0]
+
+                if not isinstance(callee, Callable):
+                    error(lines[ip - 1], 'Can only call functions and classes')
+
+                if argc != callee.arity():
+                    error(lines[ip - 1]
+                        , f'Expected {callee.arity()} arguments, got {argc}')
+
+                if type(callee) is Closure:
+                    push(self.run(callee, frame))
+                elif type(callee) is BoundMethod:
+                    frame[0] = callee.receiver
+                    push(self.run(callee.method, frame))
+                elif type(callee) is NativeFunction:
+                    push(call_native(callee, self, frame[1:], lines[ip - 1]))
+                else:
+                    push(callee.call(self, frame[1:]))
+            elif op == RETURN:
+                result = pop()
+                if open_upvalues:
+                    for upvalue in open_upvalues.values():
+                        upvalue.close()
+                return result
+            elif op == GET_UPVALUE:
+                upvalue = upvalues[code[ip]]
+                ip += 1
+                push(upvalue.cells[upvalue.index])
+            elif op == SET_LOCAL:
+                stack[code[ip]] = stack[-1]
+                ip += 1
+            elif op == SET_UPVALUE:
+                upvalue = upvalues[code[ip]]
+                ip += 1
+                upvalue.cells[upvalue.index] = stack[-1]
+            elif op == GET_PROPERTY:
+                name = constants[code[ip]]
+                ip += 1
+                obj = stack[-1]
+                if not isinstance(obj, Instance):
+                    if not isinstance(obj, NativeObject):
+                        error(name.line, 'Only instances have properties')
+                stack[-1] = obj.get(name)
+            elif op == CHECK_FIELDS:
+                if not isinstance(stack[-1], Instance):
+                    error(lines[ip - 1], 'Only instances have fields')
+            elif op == SET_PROPERTY:
+                value = pop()
+                pop().set(constants[code[ip]], value)
+                ip += 1
+                push(value)
+            elif op == NIL:
+                push(None)
+            elif op == TRUE:
+                push(True)
+            elif op == FALSE:
+                push(False)
+            elif op == EQUAL:
+                b = pop()
+                a = stack[-1]
+                stack[-1] = b is None if a is None else a == b
+            elif op == NOT_EQUAL:
+                b = pop()
+                a = stack[-1]
+                stack[-1] = b is not None if a is None else not a == b
+            elif op == GREATER:
+                b = pop()
+                a = stack[-1]
+                if not (isinstance(a, float) and isinstance(b, float)):
+                    self.operand_error(lines[ip - 1], a, b)
+                stack[-1] = a > b
+            elif op == GREATER_EQUAL:
+                b = pop()
+                a = stack[-1]
+                if not (isinstance(a, float) and isinstance(b, float)):
+                    self.operand_error(lines[ip - 1], a, b)
+                stack[-1] = a >= b
+            elif op == LESS_EQUAL:
+                b = pop()
+                a = stack[-1]
+                if not (isinstance(a, float) and isinstance(b, float)):
+                    self.operand_error(lines[ip - 1], a, b)
+                stack[-1] = a <= b
+            elif op == MULTIPLY:
+                b = pop()
+                a = stack[-1]
+                if not (isinstance(a, float) and isinstance(b, float)):
+                    self.operand_error(lines[ip - 1], a, b)
+                stack[-1] = a * b
+            elif op == DIVIDE:
+                b = pop()
+                a = stack[-1]
+                if not (isinstance(a, float) and isinstance(b, float)):
+                    self.operand_error(lines[ip - 1], a, b)
+                if b == 0.0 and not isinstance(a, Vec):
+                    error(lines[ip - 1], 'Division by zero')
+                stack[-1] = a / b
+            elif op == NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+            elif op == NEGATE:
+                value = stack[-1]
+                if not isinstance(value, float):
+                    self.operand_error(lines[ip - 1], value)
+                stack[-1] = -value
+            elif op == PRINT:
+                print(self.stringify(pop()))
+            elif op == SET_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                if name not in globals_:
+                    error(lines[ip - 1], f"Undefined variable '{name}'")
+                globals_[name] = stack[-1]
+            elif op == DEFINE_GLOBAL:
+                globals_[constants[code[ip]]] = pop()
+                ip += 1
+            elif op == GET_SUPER:
+                name = constants[code[ip]]
+                ip += 1
+                superclass = pop()
+                method = superclass.find_method(name.lexeme)
+                if method is None:
+                    error(name.line, f"Undefined property '{name.lexeme}'")
+                stack[-1] = method.bind(stack[-1])
+            elif op == CLOSURE:
+                proto = constants[code[ip]]
+                ip += 1
+                captured = []
+                for _ in range(proto.upvalue_count):
+                    is_local, index = code[ip], code[ip + 1]
+                    ip += 2
+                    if not is_local:
+                        captured.append(upvalues[index])
+                        continue
+
+                    if open_upvalues is None:
+                        open_upvalues = {}
+                    if (upvalue := open_upvalues.get(index)) is None:
+                        upvalue = open_upvalues[index] = Upvalue(stack, index)
+                    captured.append(upvalue)
+                push(Closure(proto, captured))
+            elif op == CLOSE_UPVALUE:
+                if open_upvalues and (
+                    upvalue := open_upvalues.pop(len(stack) - 1, None)
+                ):
+                    upvalue.close()
+                pop()
+            elif op == INHERIT:
+                if not isinstance(stack[-1], Class):
+                    error(lines[ip - 1], 'Superclass must be a class')
+            elif op == CLASS:
+                name = constants[code[ip]]
+                count = code[ip + 1]
+                has_superclass = code[ip + 2]
+                ip += 3
+                methods = {}
+                if count:
+                    for method in stack[-count:]:
+                        methods[method.proto.name] = method
+                    del stack[-count:]
+                superclass = stack[-1] if has_superclass else None
+                push(Class(name, superclass, methods))
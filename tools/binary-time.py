@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+# Time a numeric loop and a string-building loop, which are dominated by
+# binary operators, on the tree-walking Interpreter. Run from the top of the
+# repository.
+
+import argparse
+import sys
+import time
+
+sys.path.insert(0, '.')
+
+from lox.interpret import Interpreter
+from lox.lex import Lexer
+from lox.parse import Parser
+from lox.resolve import Resolver
+
+WORKLOADS = dict(
+    numeric = '''
+        var x = 0;
+        for (var i = 0; i < %d; i = i + 1) {
+            x = (x + i * 3 - 1) / 2;
+        }
+    '''
+    , string = '''
+        var key = "name";
+        var value = "lox";
+        var s;
+        for (var i = 0; i < %d; i = i + 1) {
+            s = key + ": " + value + ";";
+        }
+    '''
+)
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-n', type=int, default=100000, help='loop iterations')
+parser.add_argument('-r', '--repeat', type=int, default=3)
+parser.add_argument('workloads', nargs='*', default=list(WORKLOADS))
+args = parser.parse_args()
+
+for workload in args.workloads:
+    statements = Parser(
+        Lexer((WORKLOADS[workload] % args.n).encode()).scan()
+    ).parse()
+    Resolver().resolve(statements)
+
+    best = float('inf')
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        Interpreter().interpret(statements)
+        best = min(best, time.perf_counter() - start)
+
+    print(f'{workload}: {best:.3f}s')
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+# Time a recursive Lox fib, which is dominated by function calls and
+# returns, on each engine. Run from the top of the repository.
+
+import argparse
+import sys
+import time
+
+sys.path.insert(0, '.')
+
+from lox.closure import ClosureInterpreter
+from lox.interpret import Interpreter
+from lox.lex import Lexer
+from lox.parse import Parser
+from lox.resolve import Resolver
+from lox.vm import VM
+
+ENGINES = dict(tree=Interpreter, vm=VM, closure=ClosureInterpreter)
+
+SOURCE = '''
+fun fib(n) {
+    if (n < 2) return n;
+    return fib(n - 1) + fib(n - 2);
+}
+fib(%d);
+'''
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-n', type=int, default=25, help='argument to fib')
+parser.add_argument('-r', '--repeat', type=int, default=3)
+parser.add_argument('engines', nargs='*', default=list(ENGINES))
+args = parser.parse_args()
+
+def prepare():
+    statements = Parser(Lexer((SOURCE % args.n).encode()).scan()).parse()
+    Resolver().resolve(statements)
+    return statements
+
+for engine in args.engines:
+    # The tree-walking Interpreter specializes the tree it runs in place.
+    statements = prepare()
+    best = float('inf')
+    for _ in range(args.repeat):
+        interpreter = ENGINES[engine]()
+        start = time.perf_counter()
+        interpreter.interpret(statements)
+        best = min(best, time.perf_counter() - start)
+
+    print(f'{engine}: {best:.3f}s')
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+# Check that every engine prints exactly the expected output and reports the
+# expected error for every script given, or for the scripts in tools/engines,
+# and that they all exit with the same status. A script's expected output is
+# kept next to it in a .out file, and its expected error in a .err file when
+# it fails; --update writes them from the tree-walking Interpreter, to be
+# checked by hand. Run from the top of the repository.
+
+import argparse
+import subprocess
+import sys
+
+from pathlib import Path
+
+ENGINES = ('tree', 'vm', 'closure')
+EXPECTED = dict(stdout='.out', stderr='.err')
+
+def run(engine, script):
+    result = subprocess.run(
+        [sys.executable, '-m', 'lox', f'--engine={engine}', '--no-cache'
+            , script]
+        , stdin=subprocess.DEVNULL, capture_output=True, text=True
+        , timeout=args.timeout
+    )
+    return dict(
+        stdout=result.stdout, stderr=result.stderr, status=result.returncode
+    )
+
+def expected(script):
+    outputs = {}
+    for field, suffix in EXPECTED.items():
+        path = Path(script).with_suffix(suffix)
+        outputs[field] = path.read_text() if path.exists() else ''
+    return outputs
+
+def update(script, actual):
+    for field, suffix in EXPECTED.items():
+        path = Path(script).with_suffix(suffix)
+        if actual[field]:
+            path.write_text(actual[field])
+        else:
+            path.unlink(missing_ok=True)
+
+parser = argparse.ArgumentParser()
+parser.add_argument('scripts', nargs='*'
+    , default=sorted(Path(__file__).parent.joinpath('engines').glob('*.lox')))
+parser.add_argument('--timeout', type=float, default=60
+    , help='seconds to let each run take')
+parser.add_argument('--update', action='store_true'
+    , help="write the expected output from the tree engine's")
+args = parser.parse_args()
+
+failed = 0
+for script in args.scripts:
+    if args.update:
+        update(script, run(ENGINES[0], script))
+
+    outputs = expected(script)
+    status = None
+    differ = False
+    for engine in ENGINES:
+        actual = run(engine, script)
+        for field, value in outputs.items():
+            if value != actual[field]:
+                differ = True
+                print(f'{script}: {engine} {field} differs from expected')
+                for output in (value, actual[field]):
+                    print('   ', '\n    '.join(output.splitlines()[-3:]))
+
+        if status is None:
+            status = actual['status']
+        elif status != actual['status']:
+            differ = True
+            print(f'{script}: {engine} status differs from {ENGINES[0]}')
+
+    failed += differ
+
+print(f'{len(args.scripts) - failed}/{len(args.scripts)} scripts match')
+sys.exit(1 if failed else 0)
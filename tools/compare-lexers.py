@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+# Check that RegexLexer produces exactly the same tokens (or the same error)
+# as Lexer for every script given, or for a corpus of random scripts made
+# from a fixed seed. Run from the top of the repository.
+
+import argparse
+import random
+import sys
+
+sys.path.insert(0, '.')
+
+from lox.error import LoxError
+from lox.lex import Lexer, RegexLexer
+
+FIELDS = ('types', 'lexemes', 'names', 'lines', 'literals', 'texts')
+
+# Pieces of the random scripts, chosen to hit the lexers' edge cases: names
+# next to keywords, numbers with and without fractions, strings across
+# lines, comments and two-character operators. Some scripts also get one
+# piece that is an error, so that both lexers are checked to fail alike.
+PIECES = (
+    'and', 'class', 'else', 'false', 'for', 'fun', 'if', 'nil', 'or'
+    , 'print', 'return', 'super', 'this', 'true', 'var', 'while'
+    , 'x', '_', 'andy', 'class_', 'For', 'a1', '_9z'
+    , '0', '7', '123', '3.25', '007.0', '.5'
+    , '""', '"a b"', '"line\nbreak"', '"\u00e9"', '"//"'
+    , '// comment', '//', '(', ')', '{', '}', ',', '.', '-', '+', ';', '/'
+    , '*', '!', '!=', '=', '==', '<', '<=', '>', '>=', '=>', '!==', '<=='
+    , ' ', '  ', '\t', '\r', '\n', '\n\n'
+)
+ERRORS = ('"', '"open\n', '1.', '@', '#', '~', '\\', '\0', '\u00e9', '\udcff')
+
+def generate(count, seed):
+    rng = random.Random(seed)
+    for i in range(count):
+        pieces = rng.choices(PIECES, k=rng.randrange(1, 200))
+        if 0 == rng.randrange(4):
+            pieces.insert(rng.randrange(len(pieces) + 1), rng.choice(ERRORS))
+        source = ''.join(pieces).encode('utf-8', 'surrogateescape')
+        yield f'random {i}', source
+
+def read(scripts):
+    for script in scripts:
+        with open(script, 'rb') as inf:
+            yield script, inf.read()
+
+def scan(lexer, source):
+    try:
+        tokens = lexer(source).scan()
+    except (LoxError, UnicodeError) as e:
+        return f'{type(e).__name__}: {e}'
+
+    return {field: getattr(tokens, field) for field in FIELDS}
+
+parser = argparse.ArgumentParser()
+parser.add_argument('scripts', nargs='*')
+parser.add_argument('--random', type=int, default=400, metavar='COUNT'
+    , help='random scripts to check when no scripts are given')
+parser.add_argument('--seed', type=int, default=0)
+args = parser.parse_args()
+
+if args.scripts:
+    sources = list(read(args.scripts))
+else:
+    sources = list(generate(args.random, args.seed))
+
+failed = 0
+for script, source in sources:
+    expected = scan(Lexer, source)
+    actual = scan(RegexLexer, source)
+    if expected == actual:
+        continue
+
+    failed += 1
+    if isinstance(expected, str) or isinstance(actual, str):
+        print(f'{script}: {expected!r} != {actual!r}')
+        continue
+
+    for field in FIELDS:
+        if expected[field] != actual[field]:
+            print(f'{script}: {field} differ')
+
+print(f'{len(sources) - failed}/{len(sources)} scripts match')
+sys.exit(1 if failed else 0)
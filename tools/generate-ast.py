@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 
+import re
+
 from pathlib import Path
 
 def define_AST(base, types):
@@ -8,6 +10,7 @@ def define_AST(base, types):
     a('# Automatically generated')
     a('from abc import ABC, abstractmethod')
     a(f'class {base}(ABC):')
+    a('    __slots__ = ()')
     a('    @abstractmethod')
     a('    def accept(self, visitor): pass')
 
@@ -15,12 +18,19 @@ def define_AST(base, types):
     add_name = names.append
     tag = base.lower()
     for line in (x.strip() for x in types.strip().splitlines()):
+        # Fields after a '|' are filled in by later passes, not the parser.
+        line, _, annotations = line.partition('|')
         name, *fields = line.split()
-        add_name(name.lower())
+        annotations = annotations.split()
+        add_name(re.sub('(?<=[a-z])(?=[A-Z])', '_', name).lower())
         a(f'class {name}({base}):')
+        a(f'    __slots__ = {tuple(fields + annotations)!r}')
+        a(f'    __match_args__ = {tuple(fields)!r}')
         a(f'    def __init__(self, {", ".join(fields)}):')
         for field in fields:
             a(f'        self.{field} = {field}')
+        for annotation in annotations:
+            a(f'        self.{annotation} = None')
         a('    def accept(self, visitor):')
         a(f'        return visitor.visit_{names[-1]}_{tag}(self)')
 
@@ -37,18 +47,18 @@ if not basedir.exists():
 
 ASTs = dict(
     Expr = '''
-        Assign name value
-        Binary left operator right
+        Assign name value | depth slot
+        Binary left operator right | left_type right_type fast
         Call callee paren arguments
-        Get object name
+        Get object name | shape slot method
         Grouping expression
         Literal value
         Logical left operator right
-        Set object name value
-        Super keyword method
-        This keyword
+        Set object name value | shape slot transition
+        Super keyword method | depth slot
+        This keyword | depth slot
         Unary operator right
-        Variable name
+        Variable name | depth slot
     '''
     , Stmt = '''
         Block statements
@@ -61,6 +71,15 @@ ASTs = dict(
         Var name initializer
         While condition body
     '''
+    # Specialized forms of common patterns, built from resolved trees for
+    # the tree-walking Interpreter. Each keeps the generic node it replaced.
+    , Fused = '''
+        CallGlobal generic slot arguments
+        CompareLocal generic depth slot compare right
+        CompareLocalConst generic depth slot compare constant
+        GetPath object gets
+        IncrementLocal generic depth slot delta
+    '''
 )
 
 for key in ASTs:
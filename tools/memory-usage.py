@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+# Report the peak RSS of lexing, parsing and resolving a large generated Lox
+# script, all at once or streamed a declaration at a time. Streaming should
+# stay bounded however large the script is, including one where every string
+# and number is different. Run from the top of the repository.
+
+import argparse
+import resource
+import sys
+
+sys.path.insert(0, '.')
+
+from lox.bench import large_script
+from lox.lex import Lexer
+from lox.parse import Parser, StreamingParser
+from lox.resolve import Resolver
+
+# Nothing but distinct string and number literals.
+LITERALS_TEMPLATE = '''
+print "string literal number {0}" + "and another, {0}";
+print {0}.{0} + {0} * 2.5;
+'''
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-n', '--count', type=int, default=20000
+    , help='number of template repetitions in the generated script')
+parser.add_argument('--literals', action='store_true'
+    , help='generate a script of distinct string and number literals')
+parser.add_argument('--stream', action='store_true'
+    , help='lex, parse and resolve one declaration at a time')
+args = parser.parse_args()
+
+if args.literals:
+    source = ''.join(
+        LITERALS_TEMPLATE.format(i) for i in range(args.count)
+    ).encode()
+else:
+    source = large_script(args.count)
+
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+if args.stream:
+    tokens = Lexer(source).stream()
+    resolver = Resolver()
+    for statement in StreamingParser(tokens).declarations():
+        resolver.resolve([statement])
+    count = tokens.discarded + len(tokens)
+else:
+    tokens = Lexer(source).scan()
+    statements = Parser(tokens).parse()
+    Resolver().resolve(statements)
+    count = len(tokens)
+
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(f'source: {len(source) / 2**20:.1f} MiB, tokens: {count}'
+    f', peak RSS: {peak / 1024:.1f} MiB (+{(peak - baseline) / 1024:.1f} MiB)')
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+# Compare the wall time of running a script without the parse cache, while
+# filling it and with a warm cache. Run from the top of the repository.
+
+import argparse
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, '.')
+
+from lox.cache import cache_path
+
+def timed(script, *flags):
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, '-m', 'lox', *flags, script]
+        , stdout=subprocess.DEVNULL, check=True
+    )
+    return time.perf_counter() - start
+
+parser = argparse.ArgumentParser()
+parser.add_argument('script')
+parser.add_argument('-r', '--repeat', type=int, default=5)
+args = parser.parse_args()
+
+cache_path(args.script).unlink(missing_ok=True)
+cold = timed(args.script)
+uncached = min(timed(args.script, '--no-cache') for _ in range(args.repeat))
+warm = min(timed(args.script) for _ in range(args.repeat))
+
+print(f'no cache: {uncached:.3f}s, filling cache: {cold:.3f}s'
+    f', warm cache: {warm:.3f}s')